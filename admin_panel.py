@@ -907,12 +907,7 @@ def wizard_test_offload():
             req.add_header('Authorization', f'Basic {creds}')
             with _urlreq.urlopen(req, timeout=30) as resp:
                 raw = resp.read()
-            ws.s3_client.put_object(
-                Bucket=ws.bucket_name,
-                Key=key,
-                Body=raw,
-                ContentType=att.get('content_type', 'application/octet-stream'),
-            )
+            ws.put_raw(key, raw, att.get('content_type', 'application/octet-stream'))
             # Clean up test file
             try:
                 ws.s3_client.delete_object(Bucket=ws.bucket_name, Key=key)
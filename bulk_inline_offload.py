@@ -275,24 +275,25 @@ def main():
             size = att["size"]
 
             try:
-                # Download
-                data = zd.download_attachment(content_url)
-                if not data:
+                # Download, streamed straight into the Wasabi upload
+                response = zd.download_attachment_stream(content_url)
+                if response is None:
+                    stats["errors"].append(f"#{tid}: download failed for {filename}")
+                    continue
+                with response:
+                    s3_key, file_size = wasabi.upload_attachment_stream(
+                        ticket_id=tid,
+                        stream=response.raw,
+                        original_filename=filename,
+                        content_type=content_type,
+                    )
+                if not file_size:
                     stats["errors"].append(f"#{tid}: download failed for {filename}")
                     continue
-
-                # Upload to Wasabi
-                s3_key = wasabi.upload_attachment(
-                    ticket_id=tid,
-                    attachment_data=data,
-                    original_filename=filename,
-                    content_type=content_type,
-                )
                 if not s3_key:
                     stats["errors"].append(f"#{tid}: Wasabi upload failed for {filename}")
                     continue
 
-                file_size = len(data)
                 ticket_uploaded += 1
                 ticket_bytes += file_size
                 s3_keys.append(s3_key)
@@ -3,7 +3,7 @@ Database models and setup
 """
 import threading
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, BigInteger
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, BigInteger, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
@@ -53,6 +53,11 @@ class ZendeskTicketCache(Base):
     tags = Column(Text, nullable=True)                  # JSON array of strings
     cached_at = Column(DateTime, default=datetime.utcnow)  # when we last synced this row
 
+    __table_args__ = (
+        # Covers "closed tickets" scans (backup candidate anti-join).
+        Index('ix_zendesk_ticket_cache_status_ticket', 'status', 'ticket_id'),
+    )
+
 class OffloadLog(Base):
     """Log all offload operations"""
     __tablename__ = 'offload_logs'
@@ -106,6 +111,18 @@ class TicketBackupRun(Base):
     status = Column(String(50), default='completed')
     details = Column(Text, nullable=True)
 
+class TicketBackupRunDetail(Base):
+    """Per-ticket outcome of one TicketBackupRun (one row per ticket processed)"""
+    __tablename__ = 'ticket_backup_run_details'
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, nullable=False, index=True)  # ticket_backup_runs.id
+    ticket_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(50), nullable=False)  # success/failed/skipped
+    files_uploaded = Column(Integer, default=0)
+    bytes_uploaded = Column(BigInteger, default=0)
+    error = Column(Text, nullable=True)
+
 class TicketBackupItem(Base):
     """Per-ticket closed-ticket backup status for search/filter/reporting"""
     __tablename__ = 'ticket_backup_items'
@@ -121,6 +138,11 @@ class TicketBackupItem(Base):
     last_error = Column(Text, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Index-only lookup for the backup candidate anti-join.
+        Index('ix_ticket_backup_items_ticket_status', 'ticket_id', 'backup_status'),
+    )
+
 # Database setup
 # NullPool: every Session gets its own connection that is immediately closed when
 # the session closes — no pooled connections sitting idle and holding read locks
@@ -132,6 +154,9 @@ engine = create_engine(
     echo=False,
     poolclass=NullPool,
     connect_args={"check_same_thread": False, "timeout": 30},
+    # Room for every hot statement shape (backup upserts, candidate scans,
+    # scheduler/admin queries) so none is evicted and recompiled.
+    query_cache_size=1200,
 )
 
 @_sa_event.listens_for(engine, "connect")
@@ -211,6 +236,14 @@ def _migrate_database(eng=None):
         except Exception as e:
             print(f"Note: Could not create ticket_backup_runs table: {e}")
 
+    # ── ticket_backup_run_details: create if missing ───────────────────────
+    if 'ticket_backup_run_details' not in inspector.get_table_names():
+        try:
+            TicketBackupRunDetail.__table__.create(eng)
+            print("Created ticket_backup_run_details table")
+        except Exception as e:
+            print(f"Note: Could not create ticket_backup_run_details table: {e}")
+
     # ── ticket_backup_items: create if missing ──────────────────────────────
     if 'ticket_backup_items' not in inspector.get_table_names():
         try:
@@ -219,6 +252,16 @@ def _migrate_database(eng=None):
         except Exception as e:
             print(f"Note: Could not create ticket_backup_items table: {e}")
 
+    # ── indexes added after the tables shipped (no-op when present) ────────
+    for idx in (
+        *ZendeskTicketCache.__table__.indexes,
+        *TicketBackupItem.__table__.indexes,
+    ):
+        try:
+            idx.create(eng, checkfirst=True)
+        except Exception as e:
+            print(f"Note: Could not create index {idx.name}: {e}")
+
 def get_db(slug: str = None):
     """
     Get a database session.
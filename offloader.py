@@ -1,10 +1,13 @@
 """
 Main offload logic for processing tickets and uploading attachments
 """
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 import json
 import logging
+import time
 from zendesk_client import ZendeskClient
 from wasabi_client import WasabiClient
 from database import get_db, upsert_processed_ticket, ProcessedTicket, OffloadLog, ZendeskTicketCache, ZendeskStorageSnapshot, Setting
@@ -13,6 +16,14 @@ from sqlalchemy.exc import IntegrityError
 # Get logger
 logger = logging.getLogger('zendesk_offloader')
 
+# Attachments / inline images of one ticket are copied Zendesk -> Wasabi by up
+# to this many threads; the Zendesk comment edits that follow stay sequential.
+ATTACHMENT_WORKERS = 8
+# Smart recheck: comments of the next candidates are fetched this far ahead by
+# a few threads while the current one is checked (most turn out empty).
+RECHECK_FETCH_WORKERS = 8
+RECHECK_PREFETCH = 16
+
 class AttachmentOffloader:
     """Main class for offloading attachments from Zendesk to Wasabi"""
     
@@ -70,20 +81,64 @@ class AttachmentOffloader:
         finally:
             db.close()
 
+    def get_error_ticket_ids(self) -> set:
+        """Get set of ticket IDs whose last processing attempt failed."""
+        db = get_db()
+        try:
+            failed = db.query(ProcessedTicket.ticket_id).filter(
+                ProcessedTicket.status == 'error'
+            ).all()
+            return {ticket_id[0] for ticket_id in failed}
+        finally:
+            db.close()
+
     def sync_ticket_cache(self, progress_callback: Optional[Callable] = None) -> dict:
         """
-        Fetch all tickets from Zendesk and upsert them into the local
-        ZendeskTicketCache table.  Returns a small stats dict.
+        Upsert Zendesk tickets into the local ZendeskTicketCache table.
+        Returns a small stats dict.
 
-        This is the single place where we pull the full list — daily runs
-        call it so the recheck never needs a full API scan again.
+        The first sync pulls the full list; it then stores an incremental
+        export cursor (Setting TICKET_CACHE_CURSOR) so later syncs only fetch
+        tickets changed since the previous one. Daily runs call this so the
+        recheck never needs a full API scan again.
         """
         stats = {"fetched": 0, "inserted": 0, "updated": 0, "errors": 0}
         logger.info("Syncing Zendesk ticket cache…")
+        CURSOR_KEY = 'TICKET_CACHE_CURSOR'
         try:
-            all_tickets = self.zendesk.get_all_tickets(status="all")
+            sync_start_ts = int(time.time())
+
+            db = get_db()
+            try:
+                cursor_row = db.query(Setting).filter_by(key=CURSOR_KEY).first()
+                cursor = cursor_row.value if cursor_row and cursor_row.value else None
+            finally:
+                db.close()
+
+            all_tickets = None
+            new_cursor = None
+            if cursor:
+                try:
+                    all_tickets, new_cursor = self.zendesk.get_incremental_tickets(cursor=cursor)
+                    logger.info(f"Ticket cache sync: {len(all_tickets)} ticket(s) changed since last sync")
+                except Exception as e:
+                    logger.warning(f"Ticket cache sync: incremental export failed, running full scan: {e}")
+            if all_tickets is None:
+                all_tickets = self.zendesk.get_all_tickets(status="all")
+                logger.info(f"Ticket cache sync: fetched {len(all_tickets)} tickets from Zendesk")
+                # Start the cursor just before this scan; tickets changed while it
+                # ran are merged in now (the export needs start_time >= 1 min ago).
+                try:
+                    changed, new_cursor = self.zendesk.get_incremental_tickets(
+                        start_time=sync_start_ts - 120
+                    )
+                    all_tickets.extend(changed)
+                except Exception as e:
+                    logger.warning(f"Ticket cache sync: could not start incremental cursor: {e}")
+
+            # The export can repeat a ticket; keep its latest version only
+            all_tickets = list({t.get("id"): t for t in all_tickets}.values())
             stats["fetched"] = len(all_tickets)
-            logger.info(f"Ticket cache sync: fetched {len(all_tickets)} tickets from Zendesk")
 
             # Parse Zendesk ISO timestamps
             def _parse_dt(s):
@@ -94,7 +149,6 @@ class AttachmentOffloader:
                 except Exception:
                     return None
 
-            import time as _time
             db = get_db()
             try:
                 now = datetime.utcnow()
@@ -145,7 +199,7 @@ class AttachmentOffloader:
                                 except Exception as ce:
                                     db.rollback()
                                     if 'locked' in str(ce).lower() and _retry < 2:
-                                        _time.sleep(1 * (_retry + 1))
+                                        time.sleep(1 * (_retry + 1))
                                         continue
                                     raise
                             # Release connection between batches so other threads can write
@@ -165,19 +219,40 @@ class AttachmentOffloader:
                             db = get_db()
 
                 # Final commit with retry
+                committed = False
                 for _retry in range(3):
                     try:
                         db.commit()
+                        committed = True
                         break
                     except Exception as ce:
                         db.rollback()
                         if 'locked' in str(ce).lower() and _retry < 2:
-                            _time.sleep(1 * (_retry + 1))
+                            time.sleep(1 * (_retry + 1))
                             continue
                         logger.error(f"Cache sync final commit failed: {ce}")
+                        break
+                if not committed:
+                    # The last batch was lost — keep the old cursor so the next
+                    # sync fetches those tickets again
+                    stats["errors"] += 1
             finally:
                 db.close()
 
+            # ── Persist the cursor so the next sync is a delta ──────────
+            if new_cursor and not stats["errors"]:
+                db = get_db()
+                try:
+                    row = db.query(Setting).filter_by(key=CURSOR_KEY).first()
+                    if row:
+                        row.value = new_cursor
+                    else:
+                        db.add(Setting(key=CURSOR_KEY, value=new_cursor,
+                                       description='Zendesk incremental export cursor of the last ticket cache sync'))
+                    db.commit()
+                finally:
+                    db.close()
+
         except Exception as e:
             logger.error(f"sync_ticket_cache failed: {e}", exc_info=True)
             stats["errors"] += 1
@@ -214,9 +289,27 @@ class AttachmentOffloader:
             processed_ids = self.get_processed_ticket_ids()
             logger.info(f"[process_tickets] {len(processed_ids)} tickets already processed")
             
+            # Only tickets changed since the last completed run are fetched
+            # (incremental export); with no watermark yet, all are scanned.
+            SINCE_KEY = 'NEW_TICKETS_SINCE'
+            fetch_start_ts = int(time.time())
+            db = get_db()
+            try:
+                since_row = db.query(Setting).filter_by(key=SINCE_KEY).first()
+                since = int(since_row.value) if since_row and since_row.value else None
+            finally:
+                db.close()
+            
             # Get new tickets
             try:
-                new_tickets = self.zendesk.get_new_tickets(processed_ids)
+                new_tickets = self.zendesk.get_new_tickets(processed_ids, since=since)
+                if since:
+                    # Failed tickets are retried even if unchanged since then
+                    seen = {t.get("id") for t in new_tickets}
+                    new_tickets.extend(
+                        {"id": tid} for tid in sorted(self.get_error_ticket_ids(), reverse=True)
+                        if tid not in seen
+                    )
                 summary["tickets_found"] = len(new_tickets)
                 logger.info(f"[process_tickets] {len(new_tickets)} new ticket(s) to process")
             except Exception as e:
@@ -226,6 +319,7 @@ class AttachmentOffloader:
                 return summary
             
             # Process each ticket
+            read_ids = []  # tagged as read in Zendesk in bulk afterwards
             for ticket in new_tickets:
                 ticket_id = ticket.get("id")
                 db = get_db()
@@ -261,8 +355,7 @@ class AttachmentOffloader:
                         wasabi_files_size=total_size_bytes,
                     )
                     
-                    # Mark ticket as read in Zendesk
-                    self.zendesk.mark_ticket_as_read(ticket_id)
+                    read_ids.append(ticket_id)
                     
                 except Exception as e:
                     db.rollback()  # Rollback any pending transaction
@@ -285,6 +378,24 @@ class AttachmentOffloader:
                         db.rollback()
                 finally:
                     db.close()
+            
+            # Mark processed tickets as read in Zendesk (100 per call)
+            if read_ids:
+                self.zendesk.mark_tickets_as_read(read_ids)
+            
+            # Every fetched ticket is now recorded (processed or error), so the
+            # next run can start from this fetch; the overlap covers clock skew.
+            db = get_db()
+            try:
+                row = db.query(Setting).filter_by(key=SINCE_KEY).first()
+                if row:
+                    row.value = str(fetch_start_ts - 120)
+                else:
+                    db.add(Setting(key=SINCE_KEY, value=str(fetch_start_ts - 120),
+                                   description='Unix time the next new-ticket fetch starts from'))
+                db.commit()
+            finally:
+                db.close()
         
         except Exception as e:
             error_msg = f"Critical error: {str(e)}"
@@ -316,11 +427,14 @@ class AttachmentOffloader:
             "errors": []
         }
         
+        # One comments fetch serves both scans
+        comments = self.zendesk.get_ticket_comments(ticket_id)
+        
         # Get attachments for this ticket (now includes comment_id)
-        attachments = self.zendesk.get_ticket_attachments(ticket_id)
+        attachments = self.zendesk.get_ticket_attachments(ticket_id, comments)
         
         # Get inline images from comments
-        inline_images = self.zendesk.get_inline_images(ticket_id)
+        inline_images = self.zendesk.get_inline_images(ticket_id, comments)
         
         # Create a set of inline image attachment IDs to avoid processing them twice
         inline_attachment_ids = {img.get("attachment_id") for img in inline_images if img.get("attachment_id")}
@@ -329,41 +443,80 @@ class AttachmentOffloader:
             f"{len(inline_images)} inline image(s)"
         )
         
-        # Process regular attachments (excluding inline images)
+        # Pick the regular attachments (excluding inline images) to offload
+        regular_attachments = []
         for attachment in attachments:
             # Skip if this attachment is an inline image (will be processed separately)
             if attachment.get("id") in inline_attachment_ids:
                 logger.debug(f"[Ticket {ticket_id}] Skipping attachment {attachment.get('id')} (inline image — processed separately)")
                 continue
-            attachment_url = attachment.get("content_url")
-            attachment_id = attachment.get("id")
-            comment_id = attachment.get("comment_id")
             filename = attachment.get("file_name", "unknown")
-            content_type = attachment.get("content_type", "application/octet-stream")
 
             # Always skip redacted placeholder files
             if filename.lower().endswith('redacted.txt'):
                 logger.info(f"[Ticket {ticket_id}] Skipping already-redacted file: {filename}")
                 continue
 
-            if not attachment_url:
+            if not attachment.get("content_url"):
                 continue
+            regular_attachments.append(attachment)
+
+        # Pick the inline images to offload
+        inline_to_copy = []
+        for inline_image in inline_images:
+            filename = inline_image.get("file_name", "inline_image.png")
+
+            # Always skip redacted placeholder files
+            if filename.lower().endswith('redacted.txt'):
+                logger.info(f"[Ticket {ticket_id}] Skipping already-redacted inline file: {filename}")
+                continue
+
+            if not inline_image.get("content_url"):
+                logger.debug(f"[Ticket {ticket_id}] Skipping inline image {filename}: no attachment_url (id={inline_image.get('attachment_id')})")
+                continue
+            inline_to_copy.append(inline_image)
+
+        # Start every Zendesk -> Wasabi copy up front; the loops below consume
+        # the results in order and do the (sequential) Zendesk comment edits.
+        # One date for the whole ticket, so its files share a folder even
+        # when the copies straddle UTC midnight.
+        date_str = datetime.utcnow().strftime("%Y%m%d")
+        copy_pool = ThreadPoolExecutor(max_workers=ATTACHMENT_WORKERS, thread_name_prefix='offload-copy')
+        attachment_copies = [
+            copy_pool.submit(
+                self._copy_to_wasabi, ticket_id, attachment["content_url"],
+                attachment.get("file_name", "unknown"),
+                attachment.get("content_type", "application/octet-stream"), date_str,
+            )
+            for attachment in regular_attachments
+        ]
+        inline_copies = [
+            copy_pool.submit(
+                self._copy_to_wasabi, ticket_id, inline_image["content_url"],
+                inline_image.get("file_name", "inline_image.png"),
+                inline_image.get("content_type", "image/png"), date_str,
+            )
+            for inline_image in inline_to_copy
+        ]
+        copy_pool.shutdown(wait=False)  # queued copies still run to completion
+
+        # Ticket status and comment visibility don't change while links are
+        # added, so look them up once instead of per replaced attachment
+        ticket_status = self.zendesk.get_ticket_status(ticket_id) if regular_attachments else None
+        comment_public = {c.get("id"): c.get("public", True) for c in comments}
+
+        # Process regular attachments
+        for attachment, copy in zip(regular_attachments, attachment_copies):
+            attachment_id = attachment.get("id")
+            comment_id = attachment.get("comment_id")
+            filename = attachment.get("file_name", "unknown")
             
             try:
-                # Download attachment
-                attachment_data = self.zendesk.download_attachment(attachment_url)
+                # Wait for the download + Wasabi upload
+                file_size, s3_key = copy.result()
                 
-                if attachment_data:
-                    # Upload to Wasabi
-                    s3_key = self.wasabi.upload_attachment(
-                        ticket_id=ticket_id,
-                        attachment_data=attachment_data,
-                        original_filename=filename,
-                        content_type=content_type
-                    )
-                    
+                if file_size is not None:
                     if s3_key:
-                        file_size = len(attachment_data)
                         result["attachments_uploaded"] += 1
                         result["total_size_bytes"] += file_size
                         result["uploaded_files"].append({
@@ -383,7 +536,9 @@ class AttachmentOffloader:
                                 comment_id=comment_id,
                                 attachment_id=attachment_id,
                                 wasabi_url=wasabi_url,
-                                filename=filename
+                                filename=filename,
+                                ticket_status=ticket_status,
+                                is_public=comment_public.get(comment_id, True),
                             )
                             
                             if success:
@@ -410,40 +565,21 @@ class AttachmentOffloader:
                 result["errors"].append(f"Error processing {filename}: {str(e)}")
         
         # Process inline images
-        for inline_image in inline_images:
+        for inline_image, copy in zip(inline_to_copy, inline_copies):
             attachment_url = inline_image.get("content_url")
             attachment_id = inline_image.get("attachment_id")
             comment_id = inline_image.get("comment_id")
             filename = inline_image.get("file_name", "inline_image.png")
-            content_type = inline_image.get("content_type", "image/png")
             original_html = inline_image.get("original_html", "")
-
-            # Always skip redacted placeholder files
-            if filename.lower().endswith('redacted.txt'):
-                logger.info(f"[Ticket {ticket_id}] Skipping already-redacted inline file: {filename}")
-                continue
-
-            if not attachment_url:
-                logger.debug(f"[Ticket {ticket_id}] Skipping inline image {filename}: no attachment_url (id={attachment_id})")
-                continue
             
             logger.info(f"[Ticket {ticket_id}] Processing inline image: {filename} (attachment_id={attachment_id}, comment_id={comment_id})")
             
             try:
-                # Download inline image
-                image_data = self.zendesk.download_attachment(attachment_url)
+                # Wait for the download + Wasabi upload
+                image_size, s3_key = copy.result()
                 
-                if image_data:
-                    # Upload to Wasabi
-                    s3_key = self.wasabi.upload_attachment(
-                        ticket_id=ticket_id,
-                        attachment_data=image_data,
-                        original_filename=filename,
-                        content_type=content_type
-                    )
-                    
+                if image_size is not None:
                     if s3_key:
-                        image_size = len(image_data)
                         result["attachments_uploaded"] += 1
                         result["inlines_uploaded"] += 1
                         result["total_size_bytes"] += image_size
@@ -556,6 +692,28 @@ class AttachmentOffloader:
         
         return result
     
+    def _copy_to_wasabi(
+        self, ticket_id: int, attachment_url: str, filename: str, content_type: str,
+        date_str: Optional[str] = None
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Stream one attachment from Zendesk into Wasabi (never held in memory
+        whole). Returns (size, s3_key): size is None when the download failed
+        or was empty, s3_key is None when the upload failed.
+        """
+        response = self.zendesk.download_attachment_stream(attachment_url)
+        if response is None:
+            return None, None
+        with response:
+            s3_key, size = self.wasabi.upload_attachment_stream(
+                ticket_id, response.raw, filename, content_type, date_str
+            )
+        if not size:
+            # Nothing was offloaded — never let the caller remove it from Zendesk
+            logger.warning(f"[Ticket {ticket_id}] Empty content downloaded from {attachment_url}")
+            return None, None
+        return size, s3_key
+    
     def get_zendesk_storage_stats(self) -> dict:
         """
         Compute Zendesk-side storage statistics from the local database.
@@ -937,89 +1095,103 @@ class AttachmentOffloader:
             )
 
             # ── Step 2: check each candidate against Zendesk ─────────────
-            for idx, ticket_id in enumerate(candidate_ids):
-                summary["tickets_scanned"] = idx + 1
+            fetch_pool = ThreadPoolExecutor(max_workers=RECHECK_FETCH_WORKERS, thread_name_prefix='recheck-fetch')
+            comment_fetches = deque(
+                fetch_pool.submit(self.zendesk.get_ticket_comments, tid)
+                for tid in candidate_ids[:RECHECK_PREFETCH]
+            )
+            try:
+                for idx, ticket_id in enumerate(candidate_ids):
+                    summary["tickets_scanned"] = idx + 1
+                    if idx + RECHECK_PREFETCH < len(candidate_ids):
+                        comment_fetches.append(fetch_pool.submit(
+                            self.zendesk.get_ticket_comments, candidate_ids[idx + RECHECK_PREFETCH]
+                        ))
+                    comments_fetch = comment_fetches.popleft()
+
+                    if progress_callback:
+                        progress_callback(idx + 1, len(candidate_ids), ticket_id)
+
+                    db = get_db()
+                    try:
+                        comments = comments_fetch.result()
+                        attachments = self.zendesk.get_ticket_attachments(ticket_id, comments)
+                        inline_images = self.zendesk.get_inline_images(ticket_id, comments)
+
+                        inline_attachment_ids = {
+                            img.get("attachment_id") for img in inline_images
+                            if img.get("attachment_id")
+                        }
+                        remaining_regular = [
+                            a for a in attachments if a.get("id") not in inline_attachment_ids
+                        ]
+                        remaining_count = len(remaining_regular) + len(inline_images)
+
+                        if remaining_count == 0:
+                            # Genuinely no attachments (or already offloaded)
+                            summary["tickets_genuinely_empty"] += 1
+                            # Make sure it's in DB so it won't be rechecked next time
+                            upsert_processed_ticket(
+                                db,
+                                ticket_id=ticket_id,
+                                attachments_count=0,
+                                status="processed",
+                            )
+                            continue
 
-                if progress_callback:
-                    progress_callback(idx + 1, len(candidate_ids), ticket_id)
+                        # Has attachments — process it
+                        summary["tickets_with_remaining_attachments"] += 1
+                        logger.info(
+                            f"Recheck [{idx+1}/{len(candidate_ids)}] ticket {ticket_id}: "
+                            f"{remaining_count} attachment(s) still present — processing..."
+                        )
 
-                db = get_db()
-                try:
-                    attachments = self.zendesk.get_ticket_attachments(ticket_id)
-                    inline_images = self.zendesk.get_inline_images(ticket_id)
-
-                    inline_attachment_ids = {
-                        img.get("attachment_id") for img in inline_images
-                        if img.get("attachment_id")
-                    }
-                    remaining_regular = [
-                        a for a in attachments if a.get("id") not in inline_attachment_ids
-                    ]
-                    remaining_count = len(remaining_regular) + len(inline_images)
+                        result = self.process_ticket(ticket_id)
+                        summary["tickets_processed"] += 1
+                        summary["attachments_uploaded"] += result.get("attachments_uploaded", 0)
+                        summary["attachments_deleted"] += result.get("attachments_deleted", 0)
+                        summary["inlines_uploaded"] += result.get("inlines_uploaded", 0)
+                        summary["inlines_deleted"] += result.get("inlines_deleted", 0)
+                        summary["details"].append(result)
+
+                        s3_keys = [f["s3_key"] for f in result.get("uploaded_files", [])]
+                        wasabi_files_json = json.dumps(s3_keys) if s3_keys else None
 
-                    if remaining_count == 0:
-                        # Genuinely no attachments (or already offloaded)
-                        summary["tickets_genuinely_empty"] += 1
-                        # Make sure it's in DB so it won't be rechecked next time
                         upsert_processed_ticket(
                             db,
                             ticket_id=ticket_id,
-                            attachments_count=0,
+                            attachments_count=result.get("attachments_uploaded", 0),
                             status="processed",
+                            error_message=(
+                                "; ".join(result.get("errors", [])[:5])
+                                if result.get("errors") else None
+                            ),
+                            wasabi_files=wasabi_files_json,
                         )
-                        continue
-
-                    # Has attachments — process it
-                    summary["tickets_with_remaining_attachments"] += 1
-                    logger.info(
-                        f"Recheck [{idx+1}/{len(candidate_ids)}] ticket {ticket_id}: "
-                        f"{remaining_count} attachment(s) still present — processing..."
-                    )
-
-                    result = self.process_ticket(ticket_id)
-                    summary["tickets_processed"] += 1
-                    summary["attachments_uploaded"] += result.get("attachments_uploaded", 0)
-                    summary["attachments_deleted"] += result.get("attachments_deleted", 0)
-                    summary["inlines_uploaded"] += result.get("inlines_uploaded", 0)
-                    summary["inlines_deleted"] += result.get("inlines_deleted", 0)
-                    summary["details"].append(result)
 
-                    s3_keys = [f["s3_key"] for f in result.get("uploaded_files", [])]
-                    wasabi_files_json = json.dumps(s3_keys) if s3_keys else None
-
-                    upsert_processed_ticket(
-                        db,
-                        ticket_id=ticket_id,
-                        attachments_count=result.get("attachments_uploaded", 0),
-                        status="processed",
-                        error_message=(
-                            "; ".join(result.get("errors", [])[:5])
-                            if result.get("errors") else None
-                        ),
-                        wasabi_files=wasabi_files_json,
-                    )
-
-                    if result.get("errors"):
-                        summary["errors"].extend(
-                            [f"Ticket {ticket_id}: {e}" for e in result["errors"]]
-                        )
+                        if result.get("errors"):
+                            summary["errors"].extend(
+                                [f"Ticket {ticket_id}: {e}" for e in result["errors"]]
+                            )
 
-                except Exception as e:
-                    db.rollback()
-                    status_code = None
-                    if hasattr(e, 'response') and e.response is not None:
-                        status_code = e.response.status_code
-                    if status_code == 404:
-                        summary["tickets_404"] += 1
-                        summary["skipped_reasons"]["404_deleted"] = (
-                            summary["skipped_reasons"].get("404_deleted", 0) + 1
-                        )
-                    else:
-                        error_msg = f"Error rechecking ticket {ticket_id}: {str(e)}"
-                        logger.error(error_msg)
-                        summary["errors"].append(error_msg)
-                finally:
-                    db.close()
+                    except Exception as e:
+                        db.rollback()
+                        status_code = None
+                        if hasattr(e, 'response') and e.response is not None:
+                            status_code = e.response.status_code
+                        if status_code == 404:
+                            summary["tickets_404"] += 1
+                            summary["skipped_reasons"]["404_deleted"] = (
+                                summary["skipped_reasons"].get("404_deleted", 0) + 1
+                            )
+                        else:
+                            error_msg = f"Error rechecking ticket {ticket_id}: {str(e)}"
+                            logger.error(error_msg)
+                            summary["errors"].append(error_msg)
+                    finally:
+                        db.close()
+            finally:
+                fetch_pool.shutdown(wait=False, cancel_futures=True)
 
         except Exception as e:
             error_msg = f"Critical recheck error: {str(e)}"
@@ -351,6 +351,7 @@ def get_tenant_db_session(slug: str):
             echo=False,
             poolclass=NullPool,
             connect_args={'check_same_thread': False, 'timeout': 30},
+            query_cache_size=1200,  # same as the legacy engine in database.py
         )
 
         @sa_event.listens_for(engine, 'connect')
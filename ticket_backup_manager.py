@@ -2,18 +2,151 @@
 Closed ticket backup manager.
 Backs up closed Zendesk tickets to a dedicated Wasabi bucket for portability.
 """
-import json
+import functools
+import gzip
 import logging
+import multiprocessing
+import os
+import random
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, List, Optional
+from html import escape as html_escape
+from typing import Deque, Dict, List, Optional, Tuple
 
-from database import get_db, TicketBackupItem, TicketBackupRun
-from zendesk_client import ZendeskClient
-from wasabi_client import WasabiClient
+import orjson
+import requests
+from sqlalchemy import func, insert, or_, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import get_db, TicketBackupItem, TicketBackupRun, TicketBackupRunDetail
+from zendesk_client import ZendeskClient, _loads_json
+from wasabi_client import CountingReader, WasabiClient
 
 logger = logging.getLogger('zendesk_offloader')
 
+# Characters replaced with '_' when building attachment S3 keys.
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w.\-]')
+
+# Zendesk's show_many endpoint accepts at most 100 IDs per request.
+SHOW_MANY_BATCH = 100
+
+# Placeholder in the show_many lookup for tickets whose batch request failed.
+_META_UNKNOWN = object()
+
+# Runs with at least this many candidate tickets render exports in a process
+# pool so JSON/HTML/gzip CPU work stays off the GIL of the I/O threads.
+ARTIFACT_POOL_MIN_TICKETS = 1000
+
+# Wall-clock budget for downloading + uploading a single attachment, retries included.
+ATTACHMENT_DEADLINE_SECONDS = 60
+
+# gzip level for the JSON/HTML exports. Ticket JSON/HTML already shrinks
+# 5-10x at level 3; higher levels cost several times the CPU for a few percent.
+EXPORT_GZIP_LEVEL = 3
+
+# Error messages kept in TicketBackupRun.details, and per-ticket entries kept
+# in the returned run_stats['details']. Every ticket's outcome is stored
+# in full as a TicketBackupRunDetail row.
+RUN_DETAILS_MAX = 200
+
+# Backup loop: TicketBackupItem rows are upserted/committed in batches of this
+# size; the progress log uses the same cadence, so a logged count is durable.
+ITEM_FLUSH_EVERY = 25
+
+# Parallel per-folder listings when backfill_html scans the bucket.
+BACKFILL_LIST_WORKERS = 16
+
+# Ticket IDs per files_count UPDATE at the end of backfill_html.
+BACKFILL_UPDATE_CHUNK = 500
+
+# Key suffixes of the per-ticket exports (see backfill_html).
+_EXPORT_SUFFIXES = ('_ticket.json', '_ticket.html')
+
+# Number of upcoming tickets whose ticket/comments GETs are kept in flight
+# ahead of the tickets being backed up.
+PREFETCH_DEPTH = 4
+
+# Attachments are copied Zendesk -> Wasabi concurrently by this many threads
+# (sharing the Zendesk session and the S3 client), across all running tickets.
+ATTACHMENT_WORKERS = 8
+
+# Tickets backed up concurrently. Zendesk 429s are absorbed by the session's
+# shared back-off, so this mainly bounds open connections.
+TICKET_WORKERS = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _item_upsert_stmt():
+    """The TicketBackupItem upsert, built once so every flush reuses the same
+    statement object (and its compiled form from the engine's cache)."""
+    stmt = sqlite_insert(TicketBackupItem)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[TicketBackupItem.ticket_id],
+        set_={
+            'closed_at': func.coalesce(TicketBackupItem.closed_at, excluded.closed_at),
+            'last_backup_at': excluded.last_backup_at,
+            'backup_status': excluded.backup_status,
+            's3_prefix': excluded.s3_prefix,
+            'files_count': excluded.files_count,
+            'total_bytes': excluded.total_bytes,
+            'last_error': excluded.last_error,
+            'updated_at': excluded.updated_at,
+        },
+    )
+
+
+def _dumps_json(obj) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str)
+
+
+def _gzip(blob: bytes) -> bytes:
+    # mtime=0 keeps the output deterministic for identical input.
+    return gzip.compress(blob, compresslevel=EXPORT_GZIP_LEVEL, mtime=0)
+
+
+def build_ticket_artifacts(ticket: dict, comments: list, attachments: list) -> Tuple[bytes, bytes]:
+    """
+    Render the JSON and HTML exports for one ticket and gzip both.
+    Pure (no I/O, no instance state) so it can run in a worker process.
+    Returns ``(json_gz, html_gz)``.
+    """
+    export_doc = TicketBackupManager._build_export_document(ticket, comments, attachments)
+    json_blob = _dumps_json(export_doc)
+    html_blob = TicketBackupManager._build_ticket_html(ticket, comments, attachments).encode('utf-8')
+    return _gzip(json_blob), _gzip(html_blob)
+
+
+_artifact_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_artifact_pool() -> ProcessPoolExecutor:
+    """Process pool shared by large backup runs (created on first use).
+
+    Uses the spawn start method: the scheduler and Flask threads may hold
+    locks that a forked child would inherit in a locked state.
+    """
+    global _artifact_pool
+    if _artifact_pool is None:
+        _artifact_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _artifact_pool
+
+
+def _reset_artifact_pool() -> None:
+    """Drop a broken pool so the next large run starts a fresh one."""
+    global _artifact_pool
+    pool, _artifact_pool = _artifact_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 class TicketBackupManager:
     """Back up closed Zendesk ticket metadata + attachments to a Wasabi bucket."""
@@ -72,55 +205,266 @@ class TicketBackupManager:
             )
         return self.zendesk
 
-    def _collect_closed_candidates(self, db) -> List[int]:
-        """Return ticket IDs that are closed in ZD cache but not yet successfully backed up."""
+    def _collect_closed_candidates(self, db) -> Tuple[List[int], set]:
+        """
+        Return ``(ticket_ids, attempted)``: ticket IDs that are closed in ZD
+        cache but not yet successfully backed up, and the subset of those that
+        already has a (failed/skipped) backup row from an earlier run.
+        """
         from database import ZendeskTicketCache
-        from sqlalchemy.orm import aliased
-        already_done = {
-            row.ticket_id
-            for row in db.query(TicketBackupItem.ticket_id).filter(
-                TicketBackupItem.backup_status == 'success'
-            ).all()
-        }
-        rows = db.query(ZendeskTicketCache.ticket_id).filter(
-            ZendeskTicketCache.status == 'closed'
-        ).all()
-        return [r.ticket_id for r in rows if r.ticket_id not in already_done]
+        # Anti-join: closed cached tickets with no 'success' backup row.
+        query = db.query(
+            ZendeskTicketCache.ticket_id, TicketBackupItem.ticket_id.label('item_id'),
+        ).outerjoin(
+            TicketBackupItem,
+            TicketBackupItem.ticket_id == ZendeskTicketCache.ticket_id,
+        ).filter(
+            ZendeskTicketCache.status == 'closed',
+            or_(
+                TicketBackupItem.ticket_id.is_(None),
+                TicketBackupItem.backup_status.is_(None),
+                TicketBackupItem.backup_status != 'success',
+            ),
+        ).order_by(ZendeskTicketCache.id)
+        ticket_ids: List[int] = []
+        attempted = set()
+        for row in query.yield_per(1000):
+            ticket_ids.append(row.ticket_id)
+            if row.item_id is not None:
+                attempted.add(row.ticket_id)
+        return ticket_ids, attempted
 
-    def _upsert_item(
-        self, db, ticket_id: int, closed_at, backup_status: str,
+    @staticmethod
+    def _item_row(
+        ticket_id: int, closed_at, backup_status: str,
         s3_prefix: str, files_count: int, total_bytes: int, last_error
-    ):
-        from sqlalchemy.exc import IntegrityError
-        # Always expire any cached state to avoid stale reads
-        db.expire_all()
-        row = db.query(TicketBackupItem).filter_by(ticket_id=ticket_id).first()
-        if row is None:
-            row = TicketBackupItem(ticket_id=ticket_id)
-            db.add(row)
-        row.backup_status = backup_status
-        row.last_backup_at = datetime.utcnow()
-        row.s3_prefix = s3_prefix
-        row.files_count = files_count
-        row.total_bytes = total_bytes
-        row.last_error = str(last_error) if last_error else None
-        if closed_at and row.closed_at is None:
-            row.closed_at = closed_at
+    ) -> Dict:
+        """Build one TicketBackupItem upsert payload (see _upsert_items_bulk)."""
+        now = datetime.utcnow()
+        return {
+            'ticket_id': ticket_id,
+            'closed_at': closed_at,
+            'last_backup_at': now,
+            'backup_status': backup_status,
+            's3_prefix': s3_prefix,
+            'files_count': files_count,
+            'total_bytes': total_bytes,
+            'last_error': str(last_error) if last_error else None,
+            'updated_at': now,
+        }
+
+    @staticmethod
+    def _upsert_items_bulk(db, rows: List[Dict]) -> None:
+        """
+        Write TicketBackupItem payloads with a single executemany
+        ``INSERT ... ON CONFLICT(ticket_id) DO UPDATE``.
+        An existing closed_at is never overwritten; every other column is
+        replaced. Concurrent inserts of the same ticket resolve in SQLite
+        instead of raising IntegrityError.
+        """
+        if not rows:
+            return
+        db.execute(_item_upsert_stmt(), rows)
+
+    @staticmethod
+    def _insert_run_details(db, run_id: int, rows: List[Dict]) -> None:
+        """
+        Store the per-ticket outcomes of run *run_id* with one executemany
+        INSERT. A failure is logged and does not affect the run row.
+        """
+        if not rows:
+            return
         try:
-            db.flush()
-        except IntegrityError:
-            # Race condition: another thread inserted first — rollback and update
+            db.execute(
+                insert(TicketBackupRunDetail),
+                [dict(row, run_id=run_id) for row in rows],
+            )
+            db.commit()
+        except Exception as exc:
             db.rollback()
-            row = db.query(TicketBackupItem).filter_by(ticket_id=ticket_id).first()
-            if row:
-                row.backup_status = backup_status
-                row.last_backup_at = datetime.utcnow()
-                row.s3_prefix = s3_prefix
-                row.files_count = files_count
-                row.total_bytes = total_bytes
-                row.last_error = str(last_error) if last_error else None
-                if closed_at and row.closed_at is None:
-                    row.closed_at = closed_at
+            logger.warning(f"[TicketBackup] Could not store details of run {run_id}: {exc}")
+
+    @staticmethod
+    def _show_many_tickets(zd: ZendeskClient, ticket_ids: List[int]) -> Dict[int, Optional[dict]]:
+        """
+        Fetch up to 100 tickets with one tickets/show_many.json request.
+        Returns ``{ticket_id: ticket}`` for every requested ID, with None for
+        IDs Zendesk did not return (deleted or merged). Raises on HTTP errors.
+        """
+        resp = zd.session.get(
+            f"{zd.base_url}/tickets/show_many.json",
+            params={'ids': ','.join(map(str, ticket_ids))},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        found = {t.get('id'): t for t in _loads_json(resp.content).get('tickets', [])}
+        return {tid: found.get(tid) for tid in ticket_ids}
+
+    @staticmethod
+    def _prefetch_ticket(
+        pool: ThreadPoolExecutor, zd: ZendeskClient, ticket_id: int, meta
+    ) -> Tuple[Optional[Future], Optional[Future]]:
+        """
+        Submit the GETs still needed for *ticket_id* to *pool*, given its
+        show_many result *meta*. Comments are only fetched for tickets that
+        are still closed; the ticket itself only when show_many failed.
+        """
+        ticket_future = None
+        if meta is _META_UNKNOWN:
+            ticket_future = pool.submit(
+                zd.session.get, f"{zd.base_url}/tickets/{ticket_id}.json", timeout=30
+            )
+        elif meta is None or meta.get('status') != 'closed':
+            return None, None
+        return ticket_future, pool.submit(zd._fetch_comments, ticket_id)
+
+    def _fresh_attachment_urls(
+        self, zd: ZendeskClient, ticket_id: int, comment_id: int,
+        cache: Dict[int, Future],
+    ) -> Dict[int, str]:
+        """Return ``{attachment_id: content_url}`` for a comment, re-fetched from
+        Zendesk at most once per comment so inline tokens are fresh.
+
+        The cache holds one Future per comment: concurrent attachment workers
+        asking for the same comment wait on a single GET instead of each
+        issuing their own. Failed fetches are not cached, so the next attempt
+        retries them; callers pop a comment to force a refetch.
+        """
+        pending: Future = Future()
+        entry = cache.setdefault(comment_id, pending)  # atomic under the GIL
+        if entry is not pending:
+            return entry.result()
+        urls: Dict[int, str] = {}
+        try:
+            fresh_resp = zd.session.get(
+                f"{zd.base_url}/tickets/{ticket_id}/comments/{comment_id}.json",
+                timeout=15,
+            )
+            if fresh_resp.ok:
+                fresh_comment = _loads_json(fresh_resp.content).get('comment', {})
+                urls = {
+                    fresh_att.get('id'): fresh_att.get('content_url')
+                    for fresh_att in fresh_comment.get('attachments', [])
+                }
+        except Exception as exc:
+            logger.warning(
+                f"[TicketBackup] Fresh inline token failed #{ticket_id} "
+                f"comment {comment_id}: {exc}"
+            )
+        if not urls and cache.get(comment_id) is pending:
+            del cache[comment_id]
+        pending.set_result(urls)
+        return urls
+
+    @staticmethod
+    def _put_gzipped(wasabi: WasabiClient, key: str, body: bytes, content_type: str) -> int:
+        """Upload gzip-compressed *body* under *key* with ``Content-Encoding: gzip``.
+
+        The key keeps its plain ``.json`` / ``.html`` name so browsers and the
+        bucket browser decode it transparently. Returns the stored (compressed) size.
+        """
+        wasabi.put_raw(key, body, content_type, content_encoding='gzip')
+        return len(body)
+
+    @staticmethod
+    def _list_existing_keys(wasabi: WasabiClient, prefix: str) -> Dict[str, int]:
+        """Return ``{key: size}`` for objects already stored under *prefix*.
+
+        A listing failure returns an empty dict, so everything gets uploaded.
+        """
+        existing: Dict[str, int] = {}
+        try:
+            paginator = wasabi.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=wasabi.bucket_name, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    existing[obj['Key']] = obj.get('Size', 0)
+        except Exception as exc:
+            logger.warning(f"[TicketBackup] Could not list existing objects under {prefix}: {exc}")
+        return existing
+
+    def _upload_attachment_with_retry(
+        self, zd: ZendeskClient, wasabi: WasabiClient, ticket_id: int,
+        comment_id: int, att: dict, s3_key: str,
+        fresh_comments_cache: Dict[int, Future],
+        max_retries: int = 3, deadline_s: float = ATTACHMENT_DEADLINE_SECONDS,
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Copy one Zendesk attachment to *s3_key*.
+
+        Retries with exponential backoff (0.5 s, 1 s, …) up to *max_retries*
+        attempts, and gives up once *deadline_s* would be exceeded so a stuck
+        attachment cannot stall the whole ticket.
+        Returns ``(bytes_uploaded, None)`` on success, ``(None, error)`` otherwise.
+        """
+        attachment_id = att.get('id')
+        content_url = att.get('content_url')
+        deadline = time.monotonic() + deadline_s
+        error: Optional[str] = None
+
+        for attempt in range(1, max_retries + 1):
+            fresh_url = content_url
+            if att.get('inline', False):
+                fresh_urls = self._fresh_attachment_urls(
+                    zd, ticket_id, comment_id, fresh_comments_cache
+                )
+                fresh_url = fresh_urls.get(attachment_id, content_url)
+
+            if not fresh_url:
+                return None, 'No content_url available'
+
+            try:
+                # Pipe the Zendesk response straight into the (multipart)
+                # upload — nothing is buffered beyond the in-flight parts.
+                response = zd.download_attachment_stream(fresh_url)
+                if response is not None:
+                    with response:
+                        body = CountingReader(response.raw)
+                        wasabi.upload_fileobj(
+                            body, s3_key,
+                            content_type=att.get('content_type', 'application/octet-stream'),
+                        )
+                    if body.bytes_read:
+                        return body.bytes_read, None
+                # Failed or empty download — most likely an expired inline
+                # token, so refetch the comment on the next attempt.
+                fresh_comments_cache.pop(comment_id, None)
+                error = 'Download failed'
+            except Exception as exc:
+                status_code = getattr(getattr(exc, 'response', None), 'status_code', None)
+                if status_code == 403:
+                    fresh_comments_cache.pop(comment_id, None)
+                if status_code in (401, 403):
+                    logger.error(
+                        f"[TicketBackup] Permission error #{ticket_id} "
+                        f"attachment {attachment_id}: HTTP {status_code}"
+                    )
+                    return None, f"Permission error HTTP {status_code}"
+                error = str(exc)
+                if attempt == max_retries:
+                    logger.error(
+                        f"[TicketBackup] Failed #{ticket_id} att {attachment_id} "
+                        f"after {max_retries} attempts: {exc}"
+                    )
+                else:
+                    logger.warning(
+                        f"[TicketBackup] Retry {attempt} #{ticket_id} "
+                        f"att {attachment_id}: {exc}"
+                    )
+
+            if attempt < max_retries:
+                # Exponential backoff with jitter so concurrent attachment
+                # workers don't retry in lockstep.
+                backoff = 0.5 * (2 ** (attempt - 1))
+                backoff += random.uniform(0, backoff)
+                if time.monotonic() + backoff >= deadline:
+                    logger.error(
+                        f"[TicketBackup] Giving up #{ticket_id} att {attachment_id}: "
+                        f"{deadline_s:.0f}s deadline exceeded after {attempt} attempt(s)"
+                    )
+                    return None, f"{error} (deadline exceeded)"
+                time.sleep(backoff)
+
+        return None, error
 
     @staticmethod
     def _ticket_closed_datetime(ticket: dict) -> Optional[datetime]:
@@ -135,10 +479,10 @@ class TicketBackupManager:
 
     @staticmethod
     def _safe_filename(name: str) -> str:
-        name = re.sub(r'[^\w.\-]', '_', name)
-        return name[:120] if len(name) > 120 else name
+        return _UNSAFE_FILENAME_RE.sub('_', name)[:120]
 
-    def _build_export_document(self, ticket: dict, comments: list, attachments: list) -> dict:
+    @staticmethod
+    def _build_export_document(ticket: dict, comments: list, attachments: list) -> dict:
         return {
             'ticket': ticket,
             'comments': comments,
@@ -146,68 +490,318 @@ class TicketBackupManager:
             'exported_at': datetime.utcnow().isoformat(),
         }
 
-    def _build_ticket_html(self, ticket: dict, comments: list, attachments: list) -> str:
-        ticket_id = ticket.get('id', 'Unknown')
-        subject = ticket.get('subject', '')
-        requester = ticket.get('requester_id', '')
-        created = ticket.get('created_at', '')
-        status = ticket.get('status', '')
-        priority = ticket.get('priority', '')
-        html = [
-            "<html><head><meta charset='utf-8'>"
-            f"<title>Ticket #{ticket_id}</title></head><body>",
-            f"<h2>Ticket #{ticket_id}: {subject}</h2>",
-            f"<p><b>Status:</b> {status} &nbsp; <b>Priority:</b> {priority}"
-            f" &nbsp; <b>Requester:</b> {requester} &nbsp; <b>Created:</b> {created}</p>",
-            "<hr>",
-        ]
-        html.append("<h3>Comments:</h3>")
+    @staticmethod
+    def _build_ticket_html(ticket: dict, comments: list, attachments: list) -> str:
+        """Render the standalone HTML export of a ticket.
+
+        Built with f-strings into one list and joined once — measured faster
+        than a compiled Jinja2 template or str.format per comment.
+        """
+        esc_ticket_id = html_escape(str(ticket.get('id', 'Unknown')))
+        esc_subject = html_escape(str(ticket.get('subject', '') or ''))
+        esc_requester = html_escape(str(ticket.get('requester_id', '') or ''))
+        esc_created = html_escape(str(ticket.get('created_at', '') or ''))
+        esc_status = html_escape(str(ticket.get('status', '') or ''))
+        esc_priority = html_escape(str(ticket.get('priority', '') or ''))
+
+        buf: List[str] = []
+        buf_append = buf.append
+        buf_append(
+            f"<html><head><meta charset='utf-8'><title>Ticket #{esc_ticket_id}</title></head><body>\n"
+            f"<h2>Ticket #{esc_ticket_id}: {esc_subject}</h2>\n"
+            f"<p><b>Status:</b> {esc_status} &nbsp; <b>Priority:</b> {esc_priority}"
+            f" &nbsp; <b>Requester:</b> {esc_requester} &nbsp; <b>Created:</b> {esc_created}</p>\n"
+            "<hr>\n<h3>Comments:</h3>\n"
+        )
         for c in comments:
-            author = c.get('author_id', '')
-            c_created = c.get('created_at', '')
-            body = c.get('html_body') or c.get('body', '')
-            html.append(
-                f"<div style='margin-bottom:18px'><b>Author:</b> {author}"
-                f" &nbsp; <b>Created:</b> {c_created}<br>"
+            # html_body is Zendesk-rendered HTML and is kept as-is; the plain
+            # text body is escaped so it cannot inject markup.
+            body = c.get('html_body') or html_escape(str(c.get('body', '') or ''))
+            buf_append(
+                f"<div style='margin-bottom:18px'><b>Author:</b> {html_escape(str(c.get('author_id', '') or ''))}"
+                f" &nbsp; <b>Created:</b> {html_escape(str(c.get('created_at', '') or ''))}<br>"
                 f"<div style='margin:8px 0;padding:8px;background:#f6f6f6;"
-                f"border-radius:6px'>{body}</div></div>"
+                f"border-radius:6px'>{body}</div></div>\n"
             )
-        html.append("<hr><h3>Attachments:</h3>")
+        buf_append("<hr><h3>Attachments:</h3>\n")
         for att in attachments:
-            fname = att.get('file_name', '')
-            size = att.get('size', 0)
-            s3_key = att.get('s3_key', '')
-            html.append(f"<div><b>{fname}</b> ({size} bytes) &mdash; S3 Key: {s3_key}</div>")
-        html.append("</body></html>")
-        return '\n'.join(html)
+            buf_append(
+                f"<div><b>{html_escape(str(att.get('file_name', '') or ''))}</b>"
+                f" ({att.get('size', 0)} bytes) &mdash; "
+                f"S3 Key: {html_escape(str(att.get('s3_key', '') or ''))}</div>\n"
+            )
+        buf_append("</body></html>")
+        return ''.join(buf)
+
+    def _backup_one_ticket(
+        self, zd: ZendeskClient, wasabi: WasabiClient, ticket_id: int, meta,
+        prefetched: Tuple[Optional[Future], Optional[Future]], retried: bool,
+        today_folder: str, attachment_pool: ThreadPoolExecutor, artifact_state: Dict,
+    ) -> Dict:
+        """
+        Back up one ticket; runs on a ticket worker thread and never touches the DB.
+
+        Returns an outcome dict: ``row`` (TicketBackupItem payload), ``error``
+        (message for run_stats or None), ``backed_up`` and, on success, the
+        ``files_uploaded`` / ``bytes_uploaded`` / ``json_key`` of the ticket.
+        """
+        files_uploaded = 0
+        bytes_uploaded = 0
+        date_folder = today_folder
+        ticket_future, comments_future = prefetched
+        outcome: Dict = {"row": None, "error": None, "backed_up": False}
+        try:
+            if meta is _META_UNKNOWN:
+                ticket_resp = ticket_future.result()
+                fetch_status = None if ticket_resp.ok else ticket_resp.status_code
+                ticket = _loads_json(ticket_resp.content).get('ticket', {}) if ticket_resp.ok else None
+            elif meta is None:
+                fetch_status, ticket = 404, None
+            else:
+                fetch_status, ticket = None, meta
+
+            if fetch_status is not None:
+                sc = fetch_status
+                # 404 = deleted or merged ticket — skip permanently, not a failure
+                if sc == 404:
+                    logger.info(f"[TicketBackup] #{ticket_id}: not found in Zendesk (deleted/merged) — skipping")
+                    outcome['row'] = self._item_row(
+                        ticket_id=ticket_id, closed_at=None,
+                        backup_status='skipped',
+                        s3_prefix=f"{date_folder}/{ticket_id}",
+                        files_count=0, total_bytes=0,
+                        last_error='ticket not found in Zendesk (deleted or merged)',
+                    )
+                else:
+                    outcome['row'] = self._item_row(
+                        ticket_id=ticket_id, closed_at=None,
+                        backup_status='failed',
+                        s3_prefix=f"{date_folder}/{ticket_id}",
+                        files_count=0, total_bytes=0,
+                        last_error=f"ticket fetch failed HTTP {sc}",
+                    )
+                    outcome['error'] = f"#{ticket_id}: ticket fetch HTTP {sc}"
+                return outcome
+
+            if ticket.get('status') != 'closed':
+                outcome['row'] = self._item_row(
+                    ticket_id=ticket_id,
+                    closed_at=self._ticket_closed_datetime(ticket),
+                    backup_status='skipped',
+                    s3_prefix=f"{date_folder}/{ticket_id}",
+                    files_count=0, total_bytes=0,
+                    last_error='ticket no longer closed',
+                )
+                return outcome
+
+            closed_dt = self._ticket_closed_datetime(ticket)
+            date_folder = closed_dt.strftime('%Y%m%d') if closed_dt else today_folder
+
+            try:
+                comments = comments_future.result()
+            except requests.HTTPError as exc:
+                sc = exc.response.status_code
+                outcome['row'] = self._item_row(
+                    ticket_id=ticket_id,
+                    closed_at=closed_dt,
+                    backup_status='failed',
+                    s3_prefix=f"{date_folder}/{ticket_id}",
+                    files_count=0, total_bytes=0,
+                    last_error=f"comments fetch failed HTTP {sc}",
+                )
+                outcome['error'] = f"#{ticket_id}: comments fetch HTTP {sc}"
+                return outcome
+
+            attachment_manifest: List[Dict] = []
+            fresh_comments_cache: Dict[int, Future] = {}
+            # Attachments already in the bucket from an earlier (partial)
+            # run are not downloaded/uploaded again. Tickets never
+            # attempted before have nothing stored, so skip the LIST.
+            existing_keys = (
+                self._list_existing_keys(wasabi, f"{date_folder}/{ticket_id}_att_")
+                if retried else {}
+            )
+            files_reused = 0
+            bytes_reused = 0
+            pending: List[Tuple[Dict, Future]] = []
+            for comment in comments:
+                comment_id = comment.get('id')
+                for att in comment.get('attachments', []):
+                    file_name = att.get('file_name', '')
+                    if file_name.lower() == 'redacted.txt':
+                        continue
+                    content_url = att.get('content_url')
+                    attachment_id = att.get('id')
+                    safe_name = self._safe_filename(file_name)
+                    s3_key = f"{date_folder}/{ticket_id}_att_{attachment_id}_{safe_name}"
+
+                    attachment_row: Dict = {
+                        "attachment_id": attachment_id,
+                        "comment_id": comment_id,
+                        "file_name": file_name,
+                        "content_type": att.get('content_type', 'application/octet-stream'),
+                        "size": att.get('size', 0),
+                        "inline": att.get('inline', False),
+                        "zendesk_content_url": content_url,
+                        "s3_key": s3_key,
+                        "uploaded": False,
+                    }
+
+                    if s3_key in existing_keys:
+                        attachment_row['uploaded'] = True
+                        attachment_row['already_present'] = True
+                        files_reused += 1
+                        bytes_reused += existing_keys[s3_key]
+                        attachment_manifest.append(attachment_row)
+                        continue
+
+                    attachment_manifest.append(attachment_row)
+                    pending.append((attachment_row, attachment_pool.submit(
+                        self._upload_attachment_with_retry,
+                        zd, wasabi, ticket_id, comment_id, att, s3_key,
+                        fresh_comments_cache,
+                    )))
+
+            # Collect the concurrent transfers; rows are already in
+            # manifest order, results are filled in place.
+            for attachment_row, future in pending:
+                try:
+                    uploaded_bytes, error = future.result()
+                except Exception as exc:
+                    uploaded_bytes, error = None, str(exc)
+                if uploaded_bytes is not None:
+                    attachment_row['uploaded'] = True
+                    files_uploaded += 1
+                    bytes_uploaded += uploaded_bytes
+                elif error:
+                    attachment_row['error'] = error
+
+            # Render + gzip the JSON and HTML exports (in a worker
+            # process for large runs), then upload both.
+            json_gz = html_gz = None
+            artifact_pool = artifact_state.get('pool')
+            if artifact_pool is not None:
+                try:
+                    json_gz, html_gz = artifact_pool.submit(
+                        build_ticket_artifacts, ticket, comments, attachment_manifest
+                    ).result()
+                except BrokenProcessPool as exc:
+                    if artifact_state.pop('pool', None) is not None:
+                        logger.warning(
+                            f"[TicketBackup] Export process pool unavailable ({exc}); "
+                            f"rendering inline for the rest of this run"
+                        )
+                        _reset_artifact_pool()
+            if json_gz is None:
+                json_gz, html_gz = build_ticket_artifacts(
+                    ticket, comments, attachment_manifest
+                )
+            json_key = f"{date_folder}/{ticket_id}_ticket.json"
+            html_key = f"{date_folder}/{ticket_id}_ticket.html"
+            files_uploaded += 2
+            bytes_uploaded += self._put_gzipped(
+                wasabi, json_key, json_gz, 'application/json'
+            )
+            bytes_uploaded += self._put_gzipped(
+                wasabi, html_key, html_gz, 'text/html'
+            )
+
+            outcome['row'] = self._item_row(
+                ticket_id=ticket_id,
+                closed_at=closed_dt,
+                backup_status='success',
+                s3_prefix=f"{date_folder}/{ticket_id}",
+                files_count=files_uploaded + files_reused,
+                total_bytes=bytes_uploaded + bytes_reused,
+                last_error=None,
+            )
+            outcome.update(
+                backed_up=True, files_uploaded=files_uploaded,
+                bytes_uploaded=bytes_uploaded, json_key=json_key,
+            )
+
+        except Exception as exc:
+            message = f"#{ticket_id}: {exc}"
+            logger.error(f"[TicketBackup] {message}", exc_info=True)
+            outcome['error'] = message
+            outcome['row'] = self._item_row(
+                ticket_id=ticket_id, closed_at=None,
+                backup_status='failed',
+                s3_prefix=f"{date_folder}/{ticket_id}",
+                files_count=files_uploaded, total_bytes=bytes_uploaded,
+                last_error=str(exc),
+            )
+        return outcome
 
     # ── public API ─────────────────────────────────────────────────────────
 
+    @staticmethod
+    def _list_top_level(wasabi: WasabiClient) -> Tuple[List[str], List[str]]:
+        """Return ``(folder_prefixes, root_keys)`` for the bucket root."""
+        folders: List[str] = []
+        root_keys: List[str] = []
+        paginator = wasabi.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(
+            Bucket=wasabi.bucket_name, Delimiter='/',
+            PaginationConfig={'PageSize': 1000},
+        ):
+            folders.extend(cp['Prefix'] for cp in page.get('CommonPrefixes', []))
+            root_keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return folders, root_keys
+
+    @staticmethod
+    def _list_export_keys(wasabi: WasabiClient, prefix: str) -> List[str]:
+        """Return the ``*_ticket.json`` / ``*_ticket.html`` keys under *prefix*
+        (which should end in ``/``). Attachment keys are dropped page by page."""
+        keys: List[str] = []
+        paginator = wasabi.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(
+            Bucket=wasabi.bucket_name, Prefix=prefix,
+            PaginationConfig={'PageSize': 1000},
+        ):
+            keys.extend(
+                obj['Key'] for obj in page.get('Contents', [])
+                if obj['Key'].endswith(_EXPORT_SUFFIXES)
+            )
+        return keys
+
+    @staticmethod
+    def _collect_ticket_exports(keys: List[str], json_keys: Dict[str, str], html_keys: set) -> None:
+        """Sort ``*_ticket.json`` / ``*_ticket.html`` keys into *json_keys* / *html_keys*."""
+        for key in keys:
+            if key.endswith('_ticket.json'):
+                # e.g. 20251213/54_ticket.json  -> ticket_id=54
+                base = key[:-len('_ticket.json')]  # "20251213/54"
+                tid_str = base.split('/')[-1]      # "54"
+                json_keys[tid_str] = key
+            elif key.endswith('_ticket.html'):
+                base = key[:-len('_ticket.html')]
+                tid_str = base.split('/')[-1]
+                html_keys.add(tid_str)
+
     def backfill_html(self, limit: int = 0) -> Dict:
         """
         Generate and upload missing HTML files for tickets that only have JSON in the bucket.
         Reads the existing JSON from Wasabi (no Zendesk API calls needed).
         """
         wasabi = self._build_wasabi_client()
-        paginator = wasabi.s3_client.get_paginator('list_objects_v2')
 
         # Collect all keys grouped by prefix (date/ticket_id)
         json_keys: Dict[str, str] = {}   # ticket_id_str -> json_key
         html_keys: set = set()           # json_key with .html counterpart
 
         logger.info("[BackfillHTML] Scanning bucket for existing objects…")
-        for page in paginator.paginate(Bucket=wasabi.bucket_name):
-            for obj in page.get('Contents', []):
-                key = obj['Key']
-                if key.endswith('_ticket.json'):
-                    # e.g. 20251213/54_ticket.json  -> ticket_id=54
-                    base = key[:-len('_ticket.json')]  # "20251213/54"
-                    tid_str = base.split('/')[-1]      # "54"
-                    json_keys[tid_str] = key
-                elif key.endswith('_ticket.html'):
-                    base = key[:-len('_ticket.html')]
-                    tid_str = base.split('/')[-1]
-                    html_keys.add(tid_str)
+        # List the top-level (date) folders first, then page through each
+        # folder on its own thread instead of walking the bucket serially.
+        folders, root_keys = self._list_top_level(wasabi)
+        self._collect_ticket_exports(root_keys, json_keys, html_keys)
+        with ThreadPoolExecutor(
+            max_workers=BACKFILL_LIST_WORKERS, thread_name_prefix='backfill-list'
+        ) as pool:
+            # map() yields in folder order, so a ticket present in several
+            # folders resolves to the same (last) JSON key as a full scan.
+            for keys in pool.map(lambda p: self._list_export_keys(wasabi, p), folders):
+                self._collect_ticket_exports(keys, json_keys, html_keys)
 
         missing = {tid: key for tid, key in json_keys.items() if tid not in html_keys}
         total = len(missing)
@@ -223,19 +817,17 @@ class TicketBackupManager:
         for tid_str, json_key in items:
             try:
                 resp = wasabi.s3_client.get_object(Bucket=wasabi.bucket_name, Key=json_key)
-                doc = json.loads(resp['Body'].read().decode('utf-8'))
+                raw = resp['Body'].read()
+                if resp.get('ContentEncoding') == 'gzip':
+                    raw = gzip.decompress(raw)
+                doc = _loads_json(raw)
                 ticket = doc.get('ticket', {})
                 comments = doc.get('comments', [])
                 attachments = doc.get('attachments', [])
 
                 html_key = json_key.replace('_ticket.json', '_ticket.html')
                 html_blob = self._build_ticket_html(ticket, comments, attachments).encode('utf-8')
-                wasabi.s3_client.put_object(
-                    Bucket=wasabi.bucket_name,
-                    Key=html_key,
-                    Body=html_blob,
-                    ContentType='text/html',
-                )
+                self._put_gzipped(wasabi, html_key, _gzip(html_blob), 'text/html')
                 done += 1
                 if done % 500 == 0:
                     logger.info(f"[BackfillHTML] progress {done}/{len(items)}…")
@@ -251,10 +843,14 @@ class TicketBackupManager:
                 affected_ids = [int(t) for t in missing.keys() if t.isdigit()]
                 if limit > 0:
                     affected_ids = affected_ids[:limit]
-                db.query(TBI).filter(TBI.ticket_id.in_(affected_ids)).update(
-                    {TBI.files_count: TBI.files_count + 1},
-                    synchronize_session=False,
-                )
+                # Bounded IN lists: stays under SQLite's bound-parameter limit
+                # and keeps each UPDATE on the ticket_id index.
+                for start in range(0, len(affected_ids), BACKFILL_UPDATE_CHUNK):
+                    chunk = affected_ids[start:start + BACKFILL_UPDATE_CHUNK]
+                    db.query(TBI).filter(TBI.ticket_id.in_(chunk)).update(
+                        {TBI.files_count: TBI.files_count + 1},
+                        synchronize_session=False,
+                    )
                 db.commit()
             except Exception as e:
                 db.rollback()
@@ -287,240 +883,153 @@ class TicketBackupManager:
         wasabi = self._build_wasabi_client()
         zd = self._get_zendesk()
 
+        prefetch_pool: Optional[ThreadPoolExecutor] = None
+        attachment_pool: Optional[ThreadPoolExecutor] = None
+        ticket_pool: Optional[ThreadPoolExecutor] = None
         db = get_db()
+
+        # TicketBackupItem payloads are queued per ticket and written with one
+        # upsert + commit per ITEM_FLUSH_EVERY tickets.
+        pending_rows: List[Dict] = []
+
+        def _flush_items() -> None:
+            if not pending_rows:
+                return
+            try:
+                self._upsert_items_bulk(db, pending_rows)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                message = f"item status flush failed for {len(pending_rows)} tickets: {exc}"
+                run_stats['errors'].append(message)
+                logger.error(f"[TicketBackup] {message}")
+            pending_rows.clear()
+
         try:
-            candidate_ids = self._collect_closed_candidates(db)
+            # Fail fast on an unreachable/locked DB before any Zendesk or Wasabi work.
+            try:
+                db.execute(text('SELECT 1'))
+            except Exception as exc:
+                logger.error(f"[TicketBackup] Database health check failed: {exc}")
+                raise
+            candidate_ids, attempted_ids = self._collect_closed_candidates(db)
             if effective_limit > 0:
                 candidate_ids = candidate_ids[:effective_limit]
 
             run_stats['tickets_scanned'] = len(candidate_ids)
+            # Shared with the ticket workers; the first one to find the pool
+            # broken drops it so the rest render inline.
+            artifact_state: Dict = {}
+            if len(candidate_ids) >= ARTIFACT_POOL_MIN_TICKETS:
+                artifact_state['pool'] = _get_artifact_pool()
 
-            for index, ticket_id in enumerate(candidate_ids, 1):
-                files_uploaded = 0
-                bytes_uploaded = 0
-                date_folder = datetime.utcnow().strftime('%Y%m%d')
+            # Ticket metadata is fetched with show_many (SHOW_MANY_BATCH IDs per
+            # request) as the loop reaches each batch; tickets Zendesk does not
+            # return are deleted/merged.
+            ticket_meta: Dict[int, object] = {}
+
+            def _ensure_meta(pos: int) -> None:
+                if candidate_ids[pos] in ticket_meta:
+                    return
+                batch = candidate_ids[pos:pos + SHOW_MANY_BATCH]
                 try:
-                    ticket_resp = zd.session.get(
-                        f"{zd.base_url}/tickets/{ticket_id}.json",
-                        timeout=30,
+                    ticket_meta.update(self._show_many_tickets(zd, batch))
+                except Exception as exc:
+                    logger.warning(
+                        f"[TicketBackup] show_many failed for {len(batch)} tickets "
+                        f"— falling back to per-ticket fetch: {exc}"
                     )
-                    if not ticket_resp.ok:
-                        sc = ticket_resp.status_code
-                        # 404 = deleted or merged ticket — skip permanently, not a failure
-                        if sc == 404:
-                            logger.info(f"[TicketBackup] #{ticket_id}: not found in Zendesk (deleted/merged) — skipping")
-                            self._upsert_item(
-                                db=db, ticket_id=ticket_id, closed_at=None,
-                                backup_status='skipped',
-                                s3_prefix=f"{date_folder}/{ticket_id}",
-                                files_count=0, total_bytes=0,
-                                last_error='ticket not found in Zendesk (deleted or merged)',
-                            )
-                        else:
-                            self._upsert_item(
-                                db=db, ticket_id=ticket_id, closed_at=None,
-                                backup_status='failed',
-                                s3_prefix=f"{date_folder}/{ticket_id}",
-                                files_count=0, total_bytes=0,
-                                last_error=f"ticket fetch failed HTTP {sc}",
-                            )
-                            run_stats['errors'].append(
-                                f"#{ticket_id}: ticket fetch HTTP {sc}"
-                            )
-                        db.commit()
-                        continue
-
-                    ticket = ticket_resp.json().get('ticket', {})
-                    if ticket.get('status') != 'closed':
-                        self._upsert_item(
-                            db=db, ticket_id=ticket_id,
-                            closed_at=self._ticket_closed_datetime(ticket),
-                            backup_status='skipped',
-                            s3_prefix=f"{date_folder}/{ticket_id}",
-                            files_count=0, total_bytes=0,
-                            last_error='ticket no longer closed',
-                        )
-                        db.commit()
-                        continue
+                    ticket_meta.update(dict.fromkeys(batch, _META_UNKNOWN))
 
-                    closed_dt = self._ticket_closed_datetime(ticket)
-                    date_folder = (closed_dt or datetime.utcnow()).strftime('%Y%m%d')
+            # Look-ahead pipeline: the JSON GETs of the next PREFETCH_DEPTH
+            # tickets run before a ticket worker picks them up.
+            prefetch_pool = ThreadPoolExecutor(
+                max_workers=PREFETCH_DEPTH, thread_name_prefix='ticket-backup-prefetch'
+            )
+            attachment_pool = ThreadPoolExecutor(
+                max_workers=ATTACHMENT_WORKERS, thread_name_prefix='ticket-backup-att'
+            )
+            prefetched: Deque[Tuple[Optional[Future], Optional[Future]]] = deque()
+            scheduled = 0
 
-                    comments_resp = zd.session.get(
-                        f"{zd.base_url}/tickets/{ticket_id}/comments.json",
-                        timeout=30,
-                    )
-                    if not comments_resp.ok:
-                        self._upsert_item(
-                            db=db, ticket_id=ticket_id,
-                            closed_at=self._ticket_closed_datetime(ticket),
-                            backup_status='failed',
-                            s3_prefix=f"{date_folder}/{ticket_id}",
-                            files_count=0, total_bytes=0,
-                            last_error=f"comments fetch failed HTTP {comments_resp.status_code}",
-                        )
-                        run_stats['errors'].append(
-                            f"#{ticket_id}: comments fetch HTTP {comments_resp.status_code}"
-                        )
-                        db.commit()
-                        continue
+            def _schedule_prefetch(until: int) -> None:
+                nonlocal scheduled
+                until = min(until, len(candidate_ids))
+                while scheduled < until:
+                    _ensure_meta(scheduled)
+                    next_id = candidate_ids[scheduled]
+                    prefetched.append(self._prefetch_ticket(
+                        prefetch_pool, zd, next_id, ticket_meta[next_id]
+                    ))
+                    scheduled += 1
 
-                    comments = comments_resp.json().get('comments', [])
-
-                    attachment_manifest: List[Dict] = []
-                    for comment in comments:
-                        comment_id = comment.get('id')
-                        for att in comment.get('attachments', []):
-                            file_name = att.get('file_name', '')
-                            if file_name.lower() == 'redacted.txt':
-                                continue
-                            content_url = att.get('content_url')
-                            attachment_id = att.get('id')
-                            safe_name = self._safe_filename(file_name)
-                            s3_key = f"{date_folder}/{ticket_id}_att_{attachment_id}_{safe_name}"
-
-                            attachment_row: Dict = {
-                                "attachment_id": attachment_id,
-                                "comment_id": comment_id,
-                                "file_name": file_name,
-                                "content_type": att.get('content_type', 'application/octet-stream'),
-                                "size": att.get('size', 0),
-                                "inline": att.get('inline', False),
-                                "zendesk_content_url": content_url,
-                                "s3_key": s3_key,
-                                "uploaded": False,
-                            }
-
-                            max_retries = 3
-                            for attempt in range(1, max_retries + 1):
-                                fresh_url = content_url
-                                if att.get('inline', False):
-                                    try:
-                                        fresh_resp = zd.session.get(
-                                            f"{zd.base_url}/tickets/{ticket_id}/comments/{comment_id}.json",
-                                            timeout=15,
-                                        )
-                                        if fresh_resp.ok:
-                                            fresh_comment = fresh_resp.json().get('comment', {})
-                                            for fresh_att in fresh_comment.get('attachments', []):
-                                                if fresh_att.get('id') == attachment_id:
-                                                    fresh_url = fresh_att.get('content_url')
-                                                    break
-                                    except Exception as exc:
-                                        logger.warning(
-                                            f"[TicketBackup] Fresh inline token failed #{ticket_id} "
-                                            f"comment {comment_id}: {exc}"
-                                        )
-
-                                if not fresh_url:
-                                    attachment_row['error'] = 'No content_url available'
-                                    break
-
-                                try:
-                                    blob = zd.download_attachment(fresh_url)
-                                    if blob:
-                                        wasabi.s3_client.put_object(
-                                            Bucket=wasabi.bucket_name,
-                                            Key=s3_key,
-                                            Body=blob,
-                                            ContentType=att.get(
-                                                'content_type', 'application/octet-stream'
-                                            ),
-                                        )
-                                        attachment_row['uploaded'] = True
-                                        files_uploaded += 1
-                                        bytes_uploaded += len(blob)
-                                        break
-                                except Exception as exc:
-                                    if hasattr(exc, 'response') and exc.response is not None:
-                                        status_code = exc.response.status_code
-                                        if status_code in (401, 403):
-                                            logger.error(
-                                                f"[TicketBackup] Permission error #{ticket_id} "
-                                                f"attachment {attachment_id}: HTTP {status_code}"
-                                            )
-                                            attachment_row['error'] = f"Permission error HTTP {status_code}"
-                                            break
-                                    attachment_row['error'] = str(exc)
-                                    if attempt == max_retries:
-                                        logger.error(
-                                            f"[TicketBackup] Failed #{ticket_id} att {attachment_id} "
-                                            f"after {max_retries} attempts: {exc}"
-                                        )
-                                    else:
-                                        logger.warning(
-                                            f"[TicketBackup] Retry {attempt} #{ticket_id} "
-                                            f"att {attachment_id}: {exc}"
-                                        )
-
-                            attachment_manifest.append(attachment_row)
-
-                    # Upload JSON export
-                    export_doc = self._build_export_document(ticket, comments, attachment_manifest)
-                    json_blob = json.dumps(export_doc, ensure_ascii=False, default=str).encode('utf-8')
-                    json_key = f"{date_folder}/{ticket_id}_ticket.json"
-                    wasabi.s3_client.put_object(
-                        Bucket=wasabi.bucket_name, Key=json_key,
-                        Body=json_blob, ContentType='application/json',
-                    )
-                    files_uploaded += 1
-                    bytes_uploaded += len(json_blob)
-
-                    # Upload HTML export
-                    html_key = f"{date_folder}/{ticket_id}_ticket.html"
-                    html_blob = self._build_ticket_html(
-                        ticket, comments, attachment_manifest
-                    ).encode('utf-8')
-                    wasabi.s3_client.put_object(
-                        Bucket=wasabi.bucket_name, Key=html_key,
-                        Body=html_blob, ContentType='text/html',
-                    )
-                    files_uploaded += 1
-                    bytes_uploaded += len(html_blob)
+            # Folder for tickets without a usable closed_at (and for skip/failure
+            # rows): the run's start date, formatted once.
+            today_folder = started_at.strftime('%Y%m%d')
 
-                    self._upsert_item(
-                        db=db, ticket_id=ticket_id,
-                        closed_at=self._ticket_closed_datetime(ticket),
-                        backup_status='success',
-                        s3_prefix=f"{date_folder}/{ticket_id}",
-                        files_count=files_uploaded, total_bytes=bytes_uploaded,
-                        last_error=None,
-                    )
-                    db.commit()
+            # Up to TICKET_WORKERS tickets are backed up concurrently. Outcomes
+            # are applied here, in candidate order, so run_stats, the item rows
+            # and the DB session are only ever touched by this thread.
+            ticket_pool = ThreadPoolExecutor(
+                max_workers=TICKET_WORKERS, thread_name_prefix='ticket-backup'
+            )
+            in_flight: Deque[Future] = deque()
+            recorded = 0
+            # TicketBackupRunDetail payloads; run_id is known once the run row exists.
+            detail_rows: List[Dict] = []
 
+            def _record(outcome: Dict) -> None:
+                nonlocal recorded
+                recorded += 1
+                row = outcome['row']
+                pending_rows.append(row)
+                detail_rows.append({
+                    "ticket_id": row['ticket_id'],
+                    "status": row['backup_status'],
+                    "files_uploaded": outcome.get('files_uploaded', row['files_count']),
+                    "bytes_uploaded": outcome.get('bytes_uploaded', row['total_bytes']),
+                    "error": row['last_error'],
+                })
+                if outcome['error']:
+                    run_stats['errors'].append(outcome['error'])
+                if outcome['backed_up']:
                     run_stats['tickets_backed_up'] += 1
-                    run_stats['files_uploaded'] += files_uploaded
-                    run_stats['bytes_uploaded'] += bytes_uploaded
-                    run_stats['details'].append({
-                        "ticket_id": ticket_id,
-                        "files_uploaded": files_uploaded,
-                        "bytes_uploaded": bytes_uploaded,
-                        "json_key": json_key,
-                    })
-
-                except Exception as exc:
-                    db.rollback()
-                    message = f"#{ticket_id}: {exc}"
-                    run_stats['errors'].append(message)
-                    logger.error(f"[TicketBackup] {message}", exc_info=True)
-                    try:
-                        self._upsert_item(
-                            db=db, ticket_id=ticket_id, closed_at=None,
-                            backup_status='failed',
-                            s3_prefix=f"{date_folder}/{ticket_id}",
-                            files_count=files_uploaded, total_bytes=bytes_uploaded,
-                            last_error=str(exc),
-                        )
-                        db.commit()
-                    except Exception:
-                        db.rollback()
-
-                if index % 25 == 0:
+                    run_stats['files_uploaded'] += outcome['files_uploaded']
+                    run_stats['bytes_uploaded'] += outcome['bytes_uploaded']
+                    # Only the first RUN_DETAILS_MAX rows are persisted on the
+                    # run row, so don't keep the rest in memory at all.
+                    if len(run_stats['details']) < RUN_DETAILS_MAX:
+                        run_stats['details'].append({
+                            "ticket_id": row['ticket_id'],
+                            "files_uploaded": outcome['files_uploaded'],
+                            "bytes_uploaded": outcome['bytes_uploaded'],
+                            "json_key": outcome['json_key'],
+                        })
+                if len(pending_rows) >= ITEM_FLUSH_EVERY:
+                    _flush_items()
+                if recorded % ITEM_FLUSH_EVERY == 0:
                     logger.info(
-                        f"[TicketBackup] Progress {index}/{len(candidate_ids)} — "
+                        f"[TicketBackup] Progress {recorded}/{len(candidate_ids)} — "
                         f"backed up {run_stats['tickets_backed_up']}"
                     )
 
+            for index, ticket_id in enumerate(candidate_ids, 1):
+                # Keep a few tickets queued beyond the running ones so a slow
+                # ticket at the head of the window doesn't idle the pool.
+                while len(in_flight) >= 2 * TICKET_WORKERS:
+                    _record(in_flight.popleft().result())
+                _schedule_prefetch(index + PREFETCH_DEPTH)
+                in_flight.append(ticket_pool.submit(
+                    self._backup_one_ticket,
+                    zd, wasabi, ticket_id, ticket_meta.pop(ticket_id),
+                    prefetched.popleft(), ticket_id in attempted_ids,
+                    today_folder, attachment_pool, artifact_state,
+                ))
+            while in_flight:
+                _record(in_flight.popleft().result())
+
+            _flush_items()
+
             run_row = TicketBackupRun(
                 run_date=started_at,
                 tickets_scanned=run_stats['tickets_scanned'],
@@ -529,13 +1038,13 @@ class TicketBackupManager:
                 bytes_uploaded=run_stats['bytes_uploaded'],
                 errors_count=len(run_stats['errors']),
                 status='completed' if not run_stats['errors'] else 'completed_with_errors',
-                details=json.dumps({
-                    "errors": run_stats['errors'][:200],
-                    "details": run_stats['details'][:200],
-                }),
+                details=_dumps_json({
+                    "errors": run_stats['errors'][:RUN_DETAILS_MAX],
+                }).decode('utf-8'),
             )
             db.add(run_row)
             db.commit()
+            self._insert_run_details(db, run_row.id, detail_rows)
 
             # ── Mirror run row to the first active tenant DB ─────────────
             # Only mirror when running in single-tenant/legacy mode (no
@@ -549,7 +1058,7 @@ class TicketBackupManager:
                     if tenants:
                         tdb = get_tenant_db_session(tenants[0].slug)
                         try:
-                            tdb.add(TicketBackupRun(
+                            mirror_row = TicketBackupRun(
                                 run_date=run_row.run_date,
                                 tickets_scanned=run_row.tickets_scanned,
                                 tickets_backed_up=run_row.tickets_backed_up,
@@ -558,14 +1067,25 @@ class TicketBackupManager:
                                 errors_count=run_row.errors_count,
                                 status=run_row.status,
                                 details=run_row.details,
-                            ))
+                            )
+                            tdb.add(mirror_row)
                             tdb.commit()
+                            self._insert_run_details(tdb, mirror_row.id, detail_rows)
                         finally:
                             tdb.close()
                 except Exception as _te:
                     logger.warning(f"Could not mirror TicketBackupRun to tenant DB (non-fatal): {_te}")
 
         finally:
+            # Don't lose the statuses of tickets already processed when the
+            # run aborts between flushes.
+            _flush_items()
+            if prefetch_pool is not None:
+                prefetch_pool.shutdown(wait=False, cancel_futures=True)
+            if ticket_pool is not None:
+                ticket_pool.shutdown(wait=False, cancel_futures=True)
+            if attachment_pool is not None:
+                attachment_pool.shutdown(wait=False, cancel_futures=True)
             db.close()
 
         return run_stats
@@ -1,30 +1,187 @@
 """
 Wasabi B2 (S3-compatible) client for uploading attachments
 """
+import functools
+import gzip
+import zlib
+
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import IO, Optional, Tuple
 from config import WASABI_ENDPOINT, WASABI_ACCESS_KEY, WASABI_SECRET_KEY, WASABI_BUCKET_NAME
 
+MB = 1024 * 1024
+
+# Never SHA-256 the request body for SigV4 — TLS already protects integrity,
+# and hashing every attachment (or multipart part) is pure CPU overhead.
+# The connection pool is sized for concurrent attachment uploads, each of which
+# may run multipart parts in parallel (default 10); keep-alive and adaptive
+# retries let long-lived clients ride out idle periods and 503 SlowDown.
+# A dead endpoint fails within 10 s instead of botocore's 60 s; the longer read
+# timeout covers a 16 MiB part PUT over a slow uplink.
+S3_CLIENT_CONFIG = Config(
+    s3={'payload_signing_enabled': False},
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=10,
+    read_timeout=120,
+)
+
+# Shared multipart settings: objects above the threshold are split into parts
+# that are PUT concurrently, and memory stays bounded to chunksize * concurrency.
+# 16 MiB parts: S3-compatible stores lose throughput sharply on smaller parts,
+# while much larger ones would leave a typical (<= 50 MB) Zendesk attachment
+# in one or two parts and multiply the buffer memory of streamed uploads.
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * MB,
+    multipart_chunksize=16 * MB,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+# Text-like attachments (logs, CSV, JSON, XML) shrink several-fold, so they
+# are stored gzip-compressed with Content-Encoding: gzip; browsers opening the
+# presigned link decode them transparently. Below the minimum size the gzip
+# overhead isn't worth it.
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/xml', 'application/x-ndjson',
+    'application/javascript', 'image/svg+xml',
+)
+COMPRESS_MIN_BYTES = 4096
+ATTACHMENT_GZIP_LEVEL = 3
+
+
+def _is_compressible(content_type: Optional[str]) -> bool:
+    ct = (content_type or '').split(';', 1)[0].strip().lower()
+    return ct.startswith(COMPRESSIBLE_TYPES)
+
+@functools.lru_cache(maxsize=8)
+def _make_boto_client(endpoint: str, access_key: str, secret_key: str):
+    """Shared S3 client per (endpoint, credentials). boto3 clients are
+    thread-safe and costly to build (endpoint/model loading, a fresh
+    connection pool), so every WasabiClient for the same account reuses one."""
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        config=S3_CLIENT_CONFIG,
+    )
+
+
+# Explicit ListObjectsV2 paging: full 1000-key pages and no per-object owner
+# metadata. (EncodingType is left to botocore, which sets 'url' and decodes
+# the keys itself; passing it here would disable that decoding.)
+LIST_KWARGS = {'FetchOwner': False, 'PaginationConfig': {'PageSize': 1000}}
+
+# Top-level folders listed in parallel by get_storage_stats.
+STATS_LIST_WORKERS = 16
+
+
+# Presigned GET URLs for UI views (up to this lifetime) are reused while at
+# least half of their lifetime is left; long-lived links are always fresh.
+PRESIGN_CACHE_MAX_EXPIRES = 24 * 3600
+
+
+@functools.lru_cache(maxsize=4096)
+def _presigned_get(client, bucket: str, key: str, expires_in: int, window: int) -> str:
+    """Signed URL for (client, bucket, key, expires_in); *window* only rotates
+    the cache entry (see WasabiClient._presign)."""
+    return client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=expires_in,
+    )
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def _human_size(n: int) -> str:
     """Return a human-readable file size string."""
-    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
-        if n < 1024:
-            return f'{n:.1f} {unit}' if unit != 'B' else f'{n} B'
-        n /= 1024
-    return f'{n:.1f} PB'
+    if n < 1024:
+        return f'{n} B'
+    # Unit straight from the bit length: one division instead of a loop
+    unit = min((int(n).bit_length() - 1) // 10, 5)
+    return f'{n / (1 << (unit * 10)):.1f} {_SIZE_UNITS[unit]}'
+
+class CountingReader:
+    """Read-only file wrapper over a raw HTTP stream for ``upload_fileobj``.
+
+    ``read(n)`` keeps reading until *n* bytes or EOF, so multipart parts are
+    always full-sized, and the number of bytes passed through is recorded.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_read = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None or amt < 0:
+            data = self._raw.read()
+        else:
+            chunks = []
+            remaining = amt
+            while remaining > 0:
+                chunk = self._raw.read(remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            data = b''.join(chunks)
+        self.bytes_read += len(data)
+        return data
+
+
+class _GzipReader:
+    """Read-only file wrapper that gzip-compresses another reader on the fly,
+    so a streamed upload can be stored compressed without buffering it whole.
+    *head* is data already read from *raw* that comes first."""
+
+    def __init__(self, raw, head: bytes = b'', level: int = ATTACHMENT_GZIP_LEVEL):
+        self._raw = raw
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip framing
+        self._buf = bytearray(self._z.compress(head))
+        self._eof = False
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        while not self._eof and (amt is None or amt < 0 or len(self._buf) < amt):
+            chunk = self._raw.read(MB)
+            if chunk:
+                self._buf += self._z.compress(chunk)
+            else:
+                self._buf += self._z.flush()
+                self._eof = True
+        if amt is None or amt < 0:
+            amt = len(self._buf)
+        data = bytes(self._buf[:amt])
+        del self._buf[:amt]
+        return data
 
 
 class WasabiClient:
     """Client for interacting with Wasabi B2 storage"""
     
-    def __init__(self, endpoint=None, access_key=None, secret_key=None, bucket_name=None):
+    def __init__(self, endpoint=None, access_key=None, secret_key=None, bucket_name=None,
+                 transfer_config: Optional[TransferConfig] = None):
         # Allow overriding credentials for testing
         self.endpoint = endpoint or WASABI_ENDPOINT
+        # Scheme-qualified endpoint without trailing slash, computed once
+        e = (self.endpoint or '').strip()
+        self._normalized_endpoint = (e if e.startswith('http') else f"https://{e}").rstrip('/') if e else ''
         self.access_key = access_key or WASABI_ACCESS_KEY
         self.secret_key = secret_key or WASABI_SECRET_KEY
         self.bucket_name = bucket_name or WASABI_BUCKET_NAME
+        # Multipart tuning for upload_attachment / upload_fileobj
+        self.transfer_config = transfer_config or TRANSFER_CONFIG
         self._s3_client = None
     
     def _get_s3_client(self):
@@ -33,17 +190,9 @@ class WasabiClient:
             if not self.endpoint or not self.access_key or not self.secret_key:
                 raise ValueError("Wasabi credentials not configured. Please set WASABI_ENDPOINT, WASABI_ACCESS_KEY, and WASABI_SECRET_KEY in .env file")
             
-            # Normalize endpoint URL
-            endpoint = self.endpoint.strip()
-            if endpoint and not endpoint.startswith('http'):
-                endpoint = f"https://{endpoint}"
-            
-            # Initialize S3 client (Wasabi is S3-compatible)
-            self._s3_client = boto3.client(
-                's3',
-                endpoint_url=endpoint,
-                aws_access_key_id=self.access_key.strip(),
-                aws_secret_access_key=self.secret_key.strip()
+            # S3 client (Wasabi is S3-compatible), shared across instances
+            self._s3_client = _make_boto_client(
+                self._normalized_endpoint, self.access_key.strip(), self.secret_key.strip()
             )
         return self._s3_client
     
@@ -52,51 +201,141 @@ class WasabiClient:
         """Property to access S3 client with lazy initialization"""
         return self._get_s3_client()
     
+    @staticmethod
+    def _attachment_key(ticket_id: int, original_filename: str, date_str: Optional[str] = None) -> str:
+        """
+        S3 key for an attachment: YYYYMMDD/ticketID_YYYYMMDD_original_filename
+        *date_str* (YYYYMMDD) defaults to today (UTC); callers uploading a
+        batch pass it once so every file lands in the same folder.
+        """
+        date_str = date_str or datetime.utcnow().strftime("%Y%m%d")
+        
+        # Ensure filename format ticketID_YYYYMMDD_original_filename
+        prefix_ticket = f"{ticket_id}_"
+        prefix_full = f"{prefix_ticket}{date_str}_"
+        if original_filename.startswith(prefix_full):
+            filename = original_filename
+        elif original_filename.startswith(prefix_ticket):
+            # Insert date after the ticket id
+            filename = prefix_full + original_filename[len(prefix_ticket):]
+        else:
+            filename = prefix_full + original_filename
+        
+        return f"{date_str}/{filename}"
+    
     def upload_attachment(
         self, 
         ticket_id: int, 
         attachment_data: bytes, 
         original_filename: str,
-        content_type: str = "application/octet-stream"
+        content_type: str = "application/octet-stream",
+        date_str: Optional[str] = None
     ) -> Optional[str]:
         """
         Upload attachment to Wasabi B2
         Returns the S3 key if successful, None otherwise
         
         Key format: YYYYMMDD/ticketID_YYYYMMDD_original_filename
+        (YYYYMMDD = *date_str*, default today UTC)
         """
-        # Create date-based folder (YYYYMMDD)
-        date_folder = datetime.utcnow().strftime("%Y%m%d")
-        date_str = date_folder
-        
-        # Ensure filename format ticketID_YYYYMMDD_original_filename
-        prefix_ticket = f"{ticket_id}_"
-        prefix_full = f"{ticket_id}_{date_str}_"
-        if original_filename.startswith(prefix_full):
-            filename = original_filename
-        elif original_filename.startswith(prefix_ticket):
-            # Insert date after the ticket id
-            remainder = original_filename[len(prefix_ticket):]
-            filename = f"{ticket_id}_{date_str}_{remainder}"
-        else:
-            filename = f"{ticket_id}_{date_str}_{original_filename}"
+        s3_key = self._attachment_key(ticket_id, original_filename, date_str)
+        filename = s3_key.split('/', 1)[1]
         
-        # Create S3 key
-        s3_key = f"{date_folder}/{filename}"
+        content_encoding = None
+        if len(attachment_data) >= COMPRESS_MIN_BYTES and _is_compressible(content_type):
+            attachment_data = gzip.compress(attachment_data, compresslevel=ATTACHMENT_GZIP_LEVEL, mtime=0)
+            content_encoding = 'gzip'
         
         try:
-            # Upload to Wasabi
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=attachment_data,
-                ContentType=content_type
-            )
+            # Upload to Wasabi: one PUT for small blobs, concurrent multipart
+            # parts above the threshold (the transfer manager's thread setup
+            # isn't worth it for a single part).
+            if len(attachment_data) > self.transfer_config.multipart_threshold:
+                self.upload_fileobj(io.BytesIO(attachment_data), s3_key, content_type, content_encoding)
+            else:
+                self.put_raw(s3_key, attachment_data, content_type, content_encoding)
             return s3_key
-        except (ClientError, ValueError) as e:
+        except (ClientError, S3UploadFailedError, ValueError) as e:
             print(f"Error uploading {filename} to Wasabi: {e}")
             return None
     
+    def put_raw(
+        self,
+        s3_key: str,
+        body: bytes,
+        content_type: str = "application/octet-stream",
+        content_encoding: Optional[str] = None
+    ) -> None:
+        """
+        Store *body* under exactly *s3_key* with a single PUT (no key
+        rewriting, unlike upload_attachment).
+        Raises ClientError / ValueError on failure.
+        """
+        extra = {'ContentEncoding': content_encoding} if content_encoding else {}
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Body=body,
+            ContentType=content_type,
+            **extra
+        )
+    
+    def upload_attachment_stream(
+        self,
+        ticket_id: int,
+        stream: IO[bytes],
+        original_filename: str,
+        content_type: str = "application/octet-stream",
+        date_str: Optional[str] = None
+    ) -> Tuple[Optional[str], int]:
+        """
+        Streaming variant of upload_attachment: *stream* (e.g. an HTTP
+        response's ``raw``) is piped into a multipart upload without ever
+        being held in memory whole. Same key format as upload_attachment.
+        Compressible types are gzipped on the way through.
+        Returns (s3_key, bytes_uploaded); s3_key is None on failure.
+        bytes_uploaded counts the original (uncompressed) bytes.
+        """
+        s3_key = self._attachment_key(ticket_id, original_filename, date_str)
+        body = CountingReader(stream)
+        try:
+            if _is_compressible(content_type):
+                head = body.read(COMPRESS_MIN_BYTES)
+                if len(head) < COMPRESS_MIN_BYTES:
+                    # Whole file already read and too small to compress
+                    self.put_raw(s3_key, head, content_type)
+                else:
+                    self.upload_fileobj(_GzipReader(body, head), s3_key, content_type, 'gzip')
+            else:
+                self.upload_fileobj(body, s3_key, content_type)
+            return s3_key, body.bytes_read
+        except (ClientError, S3UploadFailedError, ValueError) as e:
+            print(f"Error uploading {s3_key} to Wasabi: {e}")
+            return None, body.bytes_read
+    
+    def upload_fileobj(
+        self,
+        fileobj: IO[bytes],
+        s3_key: str,
+        content_type: str = "application/octet-stream",
+        content_encoding: Optional[str] = None
+    ) -> None:
+        """
+        Upload a file-like object to *s3_key*, using concurrent multipart
+        upload for large objects (see self.transfer_config).
+        Raises ClientError / S3UploadFailedError / ValueError on failure.
+        """
+        extra = {'ContentType': content_type}
+        if content_encoding:
+            extra['ContentEncoding'] = content_encoding
+        self.s3_client.upload_fileobj(
+            fileobj,
+            self.bucket_name,
+            s3_key,
+            ExtraArgs=extra,
+            Config=self.transfer_config,
+        )
+    
     def get_file_url(self, s3_key: str, expires_in: int = 3600) -> Optional[str]:
         """
         Generate a presigned URL for accessing a file in Wasabi
@@ -110,19 +349,8 @@ class WasabiClient:
             if not self.endpoint or not self.bucket_name:
                 return None
             
-            # Normalize endpoint URL
-            endpoint = self.endpoint.strip()
-            if endpoint and not endpoint.startswith('http'):
-                endpoint = f"https://{endpoint}"
-            
             # Generate presigned URL
-            client = self._get_s3_client()
-            url = client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': s3_key},
-                ExpiresIn=expires_in
-            )
-            return url
+            return self._presign(s3_key, expires_in)
         except Exception as e:
             print(f"Error generating URL for {s3_key}: {e}")
             return None
@@ -139,37 +367,48 @@ class WasabiClient:
             if not self.endpoint or not self.bucket_name:
                 return None
             
-            # Normalize endpoint URL
-            endpoint = self.endpoint.strip()
-            if endpoint and not endpoint.startswith('http'):
-                endpoint = f"https://{endpoint}"
-            
-            # Remove trailing slash from endpoint if present
-            endpoint = endpoint.rstrip('/')
-            
             # Construct public URL
             # Format: https://endpoint/bucket/key
-            url = f"{endpoint}/{self.bucket_name}/{s3_key}"
+            url = f"{self._normalized_endpoint}/{self.bucket_name}/{s3_key}"
             return url
         except Exception as e:
             print(f"Error generating public URL for {s3_key}: {e}")
             return None
     
+    def _count_prefix(self, prefix: str) -> Tuple[int, int]:
+        """Return (object_count, total_bytes) for every key under *prefix*."""
+        count = total = 0
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, **LIST_KWARGS):
+            for obj in page.get('Contents', []):
+                count += 1
+                total += obj.get('Size', 0)
+        return count, total
+
     def get_storage_stats(self) -> dict:
         """
         Return bucket storage statistics (total objects, total size).
-        Uses list_objects_v2 with pagination — may take a few seconds for large buckets.
+        The top-level folders (one per YYYYMMDD day) are listed in parallel,
+        so large buckets cost roughly one folder's pagination, not all of them.
         Returns dict with keys: object_count, total_bytes, total_mb, total_gb, error
         """
         stats = {"object_count": 0, "total_bytes": 0, "total_mb": 0.0, "total_gb": 0.0, "error": None}
         try:
             client = self._get_s3_client()
             paginator = client.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.bucket_name)
-            for page in pages:
-                for obj in page.get('Contents', []):
+            # One delimited listing: root-level objects + the folders to shard on
+            prefixes = []
+            for page in paginator.paginate(Bucket=self.bucket_name, Delimiter='/', **LIST_KWARGS):
+                for cp in page.get('CommonPrefixes') or []:
+                    prefixes.append(cp['Prefix'])
+                for obj in page.get('Contents') or []:
                     stats["object_count"] += 1
                     stats["total_bytes"] += obj.get('Size', 0)
+            if prefixes:
+                with ThreadPoolExecutor(max_workers=min(STATS_LIST_WORKERS, len(prefixes))) as pool:
+                    for count, total in pool.map(self._count_prefix, prefixes):
+                        stats["object_count"] += count
+                        stats["total_bytes"] += total
             stats["total_mb"] = stats["total_bytes"] / (1024 * 1024)
             stats["total_gb"] = stats["total_bytes"] / (1024 * 1024 * 1024)
         except Exception as e:
@@ -189,6 +428,10 @@ class WasabiClient:
             }
         """
         result = {'folders': [], 'files': [], 'error': None}
+        # A folder listing is always "<folder>/": a bare "20241015" would also
+        # match "20241015x..." keys and misses the store's fast prefix path.
+        if prefix and delimiter == '/' and not prefix.endswith('/'):
+            prefix += '/'
         try:
             client = self._get_s3_client()
             paginator = client.get_paginator('list_objects_v2')
@@ -196,37 +439,45 @@ class WasabiClient:
                 Bucket=self.bucket_name,
                 Prefix=prefix,
                 Delimiter=delimiter,
+                **LIST_KWARGS
             )
+            folders, files = result['folders'], result['files']
             for page in pages:
-                for cp in page.get('CommonPrefixes') or []:
-                    p = cp['Prefix']
-                    name = p.rstrip('/').split('/')[-1]
-                    result['folders'].append({'prefix': p, 'name': name})
-                for obj in page.get('Contents') or []:
-                    key = obj['Key']
-                    if key == prefix:          # skip the "folder" placeholder itself
-                        continue
-                    name = key.split('/')[-1]
-                    size = obj.get('Size', 0)
-                    result['files'].append({
+                folders.extend([
+                    {'prefix': p, 'name': p.rstrip('/').rpartition('/')[2]}
+                    for p in (cp['Prefix'] for cp in page.get('CommonPrefixes') or ())
+                ])
+                files.extend([
+                    {
                         'key': key,
-                        'name': name,
-                        'size': size,
-                        'size_human': _human_size(size),
+                        'name': key.rpartition('/')[2],
+                        'size': obj.get('Size', 0),
+                        'size_human': _human_size(obj.get('Size', 0)),
                         'last_modified': obj.get('LastModified'),
-                    })
+                    }
+                    for obj in page.get('Contents') or ()
+                    # skip the "folder" placeholder itself
+                    if (key := obj['Key']) != prefix
+                ])
         except Exception as e:
             result['error'] = str(e)
         return result
 
+    def _presign(self, key: str, expires_in: int) -> str:
+        """
+        Presigned GET URL for *key*. Short-lived URLs come from a shared LRU
+        keyed on the current half-lifetime window, so repeated views don't
+        re-sign and a returned URL always has >= expires_in / 2 left.
+        """
+        client = self._get_s3_client()
+        if expires_in > PRESIGN_CACHE_MAX_EXPIRES:
+            return _presigned_get.__wrapped__(client, self.bucket_name, key, expires_in, 0)
+        window = int(time.time()) // max(expires_in // 2, 1)
+        return _presigned_get(client, self.bucket_name, key, expires_in, window)
+
     def presign_url(self, key: str, expires_in: int = 3600) -> str:
         """Return a presigned GET URL for *key*, valid for *expires_in* seconds."""
-        client = self._get_s3_client()
-        return client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': self.bucket_name, 'Key': key},
-            ExpiresIn=expires_in,
-        )
+        return self._presign(key, expires_in)
 
     def test_connection(self) -> tuple[bool, str]:
         """Test connection to Wasabi B2
@@ -242,7 +493,7 @@ class WasabiClient:
             if not self.bucket_name:
                 return False, "WASABI_BUCKET_NAME is not set"
             
-            # Reset client to ensure fresh connection
+            # Re-resolve the client for the current endpoint/credentials
             self._s3_client = None
             
             # Test connection
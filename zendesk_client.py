@@ -2,16 +2,158 @@
 Zendesk API client for fetching tickets and attachments
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
+import functools
 import re
+import threading
 import time
 import logging
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+import orjson
 from config import ZENDESK_SUBDOMAIN, ZENDESK_EMAIL, ZENDESK_API_TOKEN
 
 # Get logger
 logger = logging.getLogger('zendesk_offloader')
 
+# Keep-alive connections per host (requests defaults to 10). The session is
+# shared by every client of an account, so this covers the offload copy
+# threads, the recheck prefetch and the backup workers running at once.
+HTTP_POOL_MAXSIZE = 64
+# Distinct hosts kept pooled: the API host plus attachment/CDN hosts.
+HTTP_POOL_HOSTS = 8
+
+# Transport-level retries: connection failures (the request never reached
+# Zendesk, so retrying is safe for any method) and 502/503/504 on idempotent
+# GET/HEAD. When status retries run out the last response is returned as-is.
+# 429 is left to _RateLimitAdapter and the callers' own retry loops.
+HTTP_RETRY = Retry(
+    total=3, connect=3, read=0, status=3, other=0, backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({'GET', 'HEAD'}),
+    raise_on_status=False,
+    respect_retry_after_header=False,
+)
+
+# Zendesk API throttling (_RateLimitAdapter): a 429 is waited out (Retry-After)
+# and re-sent up to this many times before it reaches the caller, and once
+# less than this fraction of the per-minute budget is left, API calls are
+# spaced 60 / X-Rate-Limit seconds apart instead of bursting into a 429.
+RATE_LIMIT_RETRIES = 2
+RATE_LIMIT_LOW_FRACTION = 0.1
+
+# Tag marking a ticket as handled by the offloader; update_many takes at most
+# this many ticket ids per call.
+PROCESSED_TAG = "processed_by_offloader"
+UPDATE_MANY_MAX_IDS = 100
+
+# update_many runs as a background job; its job_status is polled this many
+# times, this many seconds apart, to report tickets Zendesk refused to update.
+JOB_STATUS_POLLS = 10
+JOB_STATUS_POLL_INTERVAL = 1.0
+_JOB_DONE = ("completed", "failed", "killed")
+
+# Inline-image patterns (get_inline_images and its replacement), compiled once
+_IMG_TAG_RE = re.compile(r'<img', re.IGNORECASE)
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']*attachments[^"\']*)["\'][^>]*>', re.IGNORECASE)
+_ATT_ID_RE = re.compile(r'/attachments/(\d+)')
+_ATT_TOKEN_RE = re.compile(r'/attachments/token/([^/?]+)')
+_IMG_FILENAME_RE = re.compile(r'/([^/?]+\.(?:jpg|jpeg|png|gif|bmp|webp|svg))', re.IGNORECASE)
+_NAME_PARAM_RE = re.compile(r'[?&]name=([^&]+)')
+_SRC_ATTR_RE = re.compile(r'src=["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+def _loads_json(raw: bytes):
+    """Parse UTF-8 JSON bytes with orjson (no intermediate str copy)."""
+    return orjson.loads(raw)
+
+
+def _json(response):
+    """Decode a Zendesk JSON response body."""
+    return _loads_json(response.content)
+
+
+class _RateLimitAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that shares Zendesk's back-pressure across threads: after any
+    429 its Retry-After window is recorded, and every request sent through
+    the session waits for that window to pass instead of hitting the API
+    (and extending the limit) from other worker threads. The 429'd request
+    itself is re-sent after the wait (Zendesk didn't process it).
+    To avoid the 429 in the first place, API calls are paced once the
+    X-Rate-Limit-Remaining budget runs low (see RATE_LIMIT_LOW_FRACTION).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resume_at = 0.0
+        self._next_slot = 0.0
+        self._interval = 0.0  # seconds between API calls while pacing
+        self._lock = threading.Lock()
+
+    def _wait_turn(self, request):
+        with self._lock:
+            now = time.monotonic()
+            if '/api/v2/' in request.url:
+                slot = max(now, self._resume_at, self._next_slot)
+                self._next_slot = slot + self._interval
+            else:
+                slot = max(now, self._resume_at)
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _observe(self, response):
+        try:
+            limit = int(response.headers['X-Rate-Limit'])
+            remaining = int(response.headers['X-Rate-Limit-Remaining'])
+        except (KeyError, ValueError):
+            return
+        if limit > 0:
+            # Spread what's left of the per-minute budget evenly
+            self._interval = 60.0 / limit if remaining < limit * RATE_LIMIT_LOW_FRACTION else 0.0
+
+    def send(self, request, **kwargs):
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self._wait_turn(request)
+            response = super().send(request, **kwargs)
+            if response.status_code != 429:
+                self._observe(response)
+                return response
+            try:
+                retry_after = float(response.headers.get('Retry-After', 30))
+            except ValueError:
+                retry_after = 30.0
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+            if attempt < RATE_LIMIT_RETRIES:
+                response.close()
+        return response
+
+
+@functools.lru_cache(maxsize=8)
+def _make_session(subdomain: str, email: str, api_token: str) -> requests.Session:
+    """Shared session per (subdomain, credentials). Every ZendeskClient for
+    the same account reuses its keep-alive pool and its rate-limit adapter,
+    so a 429 seen by one job also holds back the others."""
+    session = requests.Session()
+    adapter = _RateLimitAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=HTTP_RETRY,
+    )
+    session.mount("https://", adapter)
+    
+    # Set up authentication
+    credentials = f"{email}/token:{api_token}"
+    encoded_credentials = base64.b64encode(credentials.encode()).decode()
+    session.headers.update({
+        "Authorization": f"Basic {encoded_credentials}",
+        "Content-Type": "application/json"
+    })
+    return session
+
+
 class ZendeskClient:
     """Client for interacting with Zendesk API"""
     
@@ -33,15 +175,8 @@ class ZendeskClient:
             if not self.subdomain or not self.email or not self.api_token:
                 raise ValueError("Zendesk credentials not configured. Please set ZENDESK_SUBDOMAIN, ZENDESK_EMAIL, and ZENDESK_API_TOKEN in .env file")
             
-            self._session = requests.Session()
-            
-            # Set up authentication
-            credentials = f"{self.email}/token:{self.api_token}"
-            encoded_credentials = base64.b64encode(credentials.encode()).decode()
-            self._session.headers.update({
-                "Authorization": f"Basic {encoded_credentials}",
-                "Content-Type": "application/json"
-            })
+            # Shared across instances for the same account
+            self._session = _make_session(self.subdomain, self.email, self.api_token)
         return self._session
     
     @property
@@ -54,11 +189,21 @@ class ZendeskClient:
         Get all tickets from Zendesk using the List Tickets endpoint with cursor-based pagination
         Returns list of ticket dictionaries
         """
+        tickets = list(self.iter_all_tickets(status))
+        print(f"Total tickets fetched: {len(tickets)}")
+        return tickets
+    
+    def iter_all_tickets(self, status: str = "all") -> Iterator[Dict]:
+        """
+        Yield tickets page by page from the List Tickets endpoint (cursor
+        pagination), optionally only those with the given status. Only one
+        page is held in memory at a time.
+        """
         if not self.base_url:
             print("ERROR: Zendesk base_url is not set. Check ZENDESK_SUBDOMAIN configuration.")
-            return []
+            return
         
-        tickets = []
+        total = 0
         # Use the List Tickets endpoint which supports cursor-based pagination
         # and doesn't have the search response size limits
         url = f"{self.base_url}/tickets.json"
@@ -91,15 +236,18 @@ class ZendeskClient:
                         raise Exception(error_msg)
                 
                 response.raise_for_status()
-                data = response.json()
+                data = _json(response)
                 
                 # Reset retry count on success
                 retry_count = 0
                 
                 page_tickets = data.get("tickets", [])
-                tickets.extend(page_tickets)
+                total += len(page_tickets)
                 page_count += 1
-                print(f"Fetched page {page_count}: {len(page_tickets)} tickets (total: {len(tickets)})")
+                print(f"Fetched page {page_count}: {len(page_tickets)} tickets (total: {total})")
+                if status != "all":
+                    page_tickets = [t for t in page_tickets if t.get("status") == status]
+                yield from page_tickets
                 
                 # Check for next page - Zendesk uses links.next for cursor pagination
                 links = data.get("links", {})
@@ -128,73 +276,72 @@ class ZendeskClient:
                 error_msg = f"Error fetching tickets: {e}"
                 print(f"ERROR: {error_msg}")
                 raise Exception(error_msg)
-        
-        # Filter by status if needed
-        if status != "all":
-            original_count = len(tickets)
-            tickets = [t for t in tickets if t.get("status") == status]
-            print(f"Filtered tickets by status '{status}': {len(tickets)} out of {original_count}")
-        
-        print(f"Total tickets fetched: {len(tickets)}")
-        return tickets
     
-    def get_ticket_attachments(self, ticket_id: int) -> List[Dict]:
+    def _fetch_comments(self, ticket_id: int) -> List[Dict]:
+        """GET the ticket's comments. Raises requests exceptions on failure."""
+        response = self.session.get(
+            f"{self.base_url}/tickets/{ticket_id}/comments.json", timeout=30
+        )
+        response.raise_for_status()
+        return _json(response).get("comments", [])
+    
+    def get_ticket_attachments(self, ticket_id: int, comments: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Get all attachments for a specific ticket with their comment information
         Returns list of attachment dicts with added 'comment_id' field
+        Pass *comments* (from get_ticket_comments) to reuse an existing fetch.
         """
         if not self.base_url:
             return []
         
         attachments = []
-        url = f"{self.base_url}/tickets/{ticket_id}/comments.json"
         
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            if comments is None:
+                comments = self._fetch_comments(ticket_id)
             
             # Extract attachments from all comments with comment_id
-            for comment in data.get("comments", []):
+            for comment in comments:
                 comment_id = comment.get("id")
                 for attachment in comment.get("attachments", []):
-                    # Add comment_id to attachment for later reference
-                    attachment_with_comment = attachment.copy()
-                    attachment_with_comment["comment_id"] = comment_id
-                    attachment_with_comment["is_inline"] = False  # Regular attachment
-                    attachments.append(attachment_with_comment)
+                    # Add comment_id to attachment for later reference (the
+                    # dicts come from a freshly parsed response — no copy needed)
+                    attachment["comment_id"] = comment_id
+                    attachment["is_inline"] = False  # Regular attachment
+                    attachments.append(attachment)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching attachments for ticket {ticket_id}: {e}")
         
         return attachments
     
-    def get_inline_images(self, ticket_id: int) -> List[Dict]:
+    def get_inline_images(self, ticket_id: int, comments: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Get all inline images from ticket comments
         Returns list of inline image dicts with comment_id and image info
         Inline images are images embedded in comment HTML, not regular attachments.
         These are processed exactly like regular attachments: download, upload to Wasabi, replace with link, delete.
+        Pass *comments* (from get_ticket_comments) to reuse an existing fetch.
         """
         if not self.base_url:
             return []
         
         inline_images = []
-        url = f"{self.base_url}/tickets/{ticket_id}/comments.json"
         
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            if comments is None:
+                comments = self._fetch_comments(ticket_id)
             
-            print(f"Fetching inline images from {len(data.get('comments', []))} comments for ticket {ticket_id}")
+            print(f"Fetching inline images from {len(comments)} comments for ticket {ticket_id}")
             
             # Extract inline images from all comments
-            for comment in data.get("comments", []):
+            for comment in comments:
                 comment_id = comment.get("id")
                 # Prefer html_body for image scanning — body is plain text and may strip img tags
                 comment_body = comment.get("html_body") or comment.get("body", "") or ""
                 
-                if not comment_body:
+                # Most comments carry no images: skip the attachment index and
+                # regex scan (the tag match is case-insensitive, so is this)
+                if not comment_body or not _IMG_TAG_RE.search(comment_body):
                     continue
                 
                 # First, collect all known attachments & inline_attachments for this comment
@@ -203,13 +350,18 @@ class ZendeskClient:
                 token_to_att = {}
                 for att in all_comment_atts:
                     att_url = att.get("content_url", "")
-                    token_m = re.search(r'/attachments/token/([^/?]+)', att_url)
+                    token_m = _ATT_TOKEN_RE.search(att_url)
                     if token_m:
                         token_to_att[token_m.group(1)] = att
+                # (attachment, normalized URL, id as str) for the per-image scan
+                matchable_atts = [
+                    (att, att["content_url"].split('?')[0].rstrip('/'), str(att["id"]))
+                    for att in all_comment_atts
+                    if att.get("content_url") and att.get("id")
+                ]
                 
                 # Find all <img> tags pointing to Zendesk attachment URLs
-                img_pattern = r'<img[^>]+src=["\']([^"\']*attachments[^"\']*)["\'][^>]*>'
-                matches = list(re.finditer(img_pattern, comment_body, re.IGNORECASE))
+                matches = list(_IMG_SRC_RE.finditer(comment_body))
                 
                 if matches:
                     print(f"Found {len(matches)} inline image(s) in comment {comment_id} for ticket {ticket_id}")
@@ -231,7 +383,7 @@ class ZendeskClient:
                     img_url_norm = img_url.split('?')[0].rstrip('/')
                     
                     # 1. Token match via pre-built index
-                    token_m = re.search(r'/attachments/token/([^/?]+)', img_url)
+                    token_m = _ATT_TOKEN_RE.search(img_url)
                     if token_m and token_m.group(1) in token_to_att:
                         att = token_to_att[token_m.group(1)]
                         attachment_id = att.get("id")
@@ -239,47 +391,36 @@ class ZendeskClient:
                         content_type = att.get("content_type", content_type)
                         download_url = att.get("content_url", img_url)
                     
-                    if not attachment_id:
-                        for att in all_comment_atts:
-                            att_url = att.get("content_url", "")
-                            att_id = att.get("id")
-                            if not att_url or not att_id:
-                                continue
-                            att_url_norm = att_url.split('?')[0].rstrip('/')
-                            
-                            # 2. Direct URL match
-                            if img_url_norm == att_url_norm or img_url_norm in att_url_norm or att_url_norm in img_url_norm:
-                                attachment_id = att_id
-                                filename = att.get("file_name", filename)
-                                content_type = att.get("content_type", content_type)
-                                download_url = att_url
-                                break
-                            
-                            # 3. Numeric ID in URL
-                            id_match = re.search(r'/attachments/(\d+)', img_url)
-                            if id_match and str(att_id) == id_match.group(1):
-                                attachment_id = att_id
-                                filename = att.get("file_name", filename)
-                                content_type = att.get("content_type", content_type)
-                                download_url = att_url
-                                break
-                            
-                            # 4. Filename match
-                            fn_match = re.search(r'/([^/?]+\.(?:jpg|jpeg|png|gif|bmp|webp|svg))', img_url, re.IGNORECASE)
-                            if fn_match and fn_match.group(1).lower() == att.get("file_name", "").lower():
-                                attachment_id = att_id
+                    if not attachment_id and matchable_atts:
+                        # The URL's attachment id and filename don't depend on
+                        # the attachment being compared — extract them once
+                        id_match = _ATT_ID_RE.search(img_url)
+                        url_att_id = id_match.group(1) if id_match else None
+                        fn_match = _IMG_FILENAME_RE.search(img_url)
+                        url_filename = fn_match.group(1).lower() if fn_match else None
+                        
+                        for att, att_url_norm, att_id_str in matchable_atts:
+                            if (
+                                # 2. Direct URL match
+                                img_url_norm == att_url_norm or img_url_norm in att_url_norm or att_url_norm in img_url_norm
+                                # 3. Numeric ID in URL
+                                or att_id_str == url_att_id
+                                # 4. Filename match
+                                or (url_filename is not None and url_filename == att.get("file_name", "").lower())
+                            ):
+                                attachment_id = att["id"]
                                 filename = att.get("file_name", filename)
                                 content_type = att.get("content_type", content_type)
-                                download_url = att_url
+                                download_url = att["content_url"]
                                 break
                     
                     # Extract filename from URL if still default
                     if filename == "inline_image.png":
-                        name_m = re.search(r'[?&]name=([^&]+)', img_url)
+                        name_m = _NAME_PARAM_RE.search(img_url)
                         if name_m:
                             filename = name_m.group(1)
                         else:
-                            fn_m = re.search(r'/([^/?]+\.(?:jpg|jpeg|png|gif|bmp|webp|svg))', img_url, re.IGNORECASE)
+                            fn_m = _IMG_FILENAME_RE.search(img_url)
                             if fn_m:
                                 filename = fn_m.group(1)
                         # Guess content type from extension
@@ -319,13 +460,8 @@ class ZendeskClient:
         if not self.base_url:
             return []
         
-        url = f"{self.base_url}/tickets/{ticket_id}/comments.json"
-        
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("comments", [])
+            return self._fetch_comments(ticket_id)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching comments for ticket {ticket_id}: {e}")
             return []
@@ -337,7 +473,7 @@ class ZendeskClient:
         try:
             resp = self.session.get(f"{self.base_url}/tickets/{ticket_id}.json")
             if resp.ok:
-                return resp.json().get("ticket", {}).get("status")
+                return _json(resp).get("ticket", {}).get("status")
         except Exception as e:
             print(f"Error fetching status for ticket {ticket_id}: {e}")
         return None
@@ -604,7 +740,7 @@ class ZendeskClient:
             # If still no change, try replacing just the src URL
             if modified_body == comment_body:
                 # Extract the src URL from original_html
-                src_match = re.search(r'src=["\']([^"\']*)["\']', original_html, re.IGNORECASE)
+                src_match = _SRC_ATTR_RE.search(original_html)
                 if src_match:
                     src_url = src_match.group(1)
                     # Replace any img tag with this src
@@ -671,11 +807,14 @@ class ZendeskClient:
             traceback.print_exc()
             return False
     
-    def replace_attachment_in_comment(self, ticket_id: int, comment_id: int, attachment_id: int, wasabi_url: str, filename: str) -> bool:
+    def replace_attachment_in_comment(self, ticket_id: int, comment_id: int, attachment_id: int, wasabi_url: str, filename: str,
+                                      ticket_status: Optional[str] = None, is_public: Optional[bool] = None) -> bool:
         """
         Replace an attachment in a comment with a Wasabi link
         Since Zendesk API doesn't allow updating existing comments directly,
         we'll add a new comment with the Wasabi link and then delete the attachment
+        Callers replacing several attachments of one ticket can pass the
+        ticket's status and the comment's visibility to skip looking them up.
         """
         if not self.base_url:
             return False
@@ -684,22 +823,18 @@ class ZendeskClient:
         
         try:
             # Check ticket status — closed tickets cannot be updated via Zendesk API
-            ticket_resp = self.session.get(url)
-            ticket_status = None
-            if ticket_resp.ok:
-                ticket_status = ticket_resp.json().get("ticket", {}).get("status")
+            if ticket_status is None:
+                ticket_resp = self.session.get(url)
+                if ticket_resp.ok:
+                    ticket_status = _json(ticket_resp).get("ticket", {}).get("status")
 
             # Get the original comment to check if it's public or private
-            comments = self.get_ticket_comments(ticket_id)
-            original_comment = None
-            for comment in comments:
-                if comment.get("id") == comment_id:
-                    original_comment = comment
-                    break
-            
-            is_public = True
-            if original_comment:
-                is_public = original_comment.get("public", True)
+            if is_public is None:
+                is_public = True
+                for comment in self.get_ticket_comments(ticket_id):
+                    if comment.get("id") == comment_id:
+                        is_public = comment.get("public", True)
+                        break
 
             if ticket_status == "closed":
                 # Closed tickets cannot receive new comments or redactions — skip silently,
@@ -768,11 +903,12 @@ class ZendeskClient:
             print(f"ERROR: Request exception when redacting attachment {attachment_id}: {e}")
             return False
     
-    def download_attachment(self, attachment_url: str, max_retries: int = 3) -> Optional[bytes]:
+    def _get_attachment_response(self, attachment_url: str, max_retries: int = 3, stream: bool = False) -> Optional[requests.Response]:
         """
-        Download attachment content with retry logic.
+        GET an attachment URL with retry logic and return the successful response.
         Handles both regular attachment URLs and inline image URLs.
         Retries on transient errors (429, 5xx, timeouts).
+        With stream=True the body is left unread so callers can consume it in chunks.
         """
         try:
             # Ensure URL is absolute
@@ -783,7 +919,7 @@ class ZendeskClient:
             for attempt in range(1, max_retries + 1):
                 try:
                     # Use the session which has authentication
-                    response = self.session.get(attachment_url, timeout=30)
+                    response = self.session.get(attachment_url, timeout=30, stream=stream)
                     
                     # Handle rate limiting
                     if response.status_code == 429:
@@ -804,21 +940,15 @@ class ZendeskClient:
                         # Strip query params and try bare URL
                         bare_url = attachment_url.split('?')[0]
                         if bare_url != attachment_url:
-                            alt_resp = self.session.get(bare_url, timeout=30)
-                            if alt_resp.ok and alt_resp.content:
+                            alt_resp = self.session.get(bare_url, timeout=30, stream=stream)
+                            if alt_resp.ok and (stream or alt_resp.content):
                                 logger.info(f"Download succeeded with bare URL (no query params)")
-                                return alt_resp.content
+                                return alt_resp
                         time.sleep(1)
                         continue
                     
                     response.raise_for_status()
-                    
-                    # Check if we got actual content
-                    if response.content:
-                        return response.content
-                    else:
-                        logger.warning(f"Empty content downloaded from {attachment_url}")
-                        return None
+                    return response
                         
                 except requests.exceptions.Timeout:
                     last_error = f"Timeout downloading {attachment_url} (attempt {attempt}/{max_retries})"
@@ -840,6 +970,34 @@ class ZendeskClient:
             logger.error(f"Error downloading attachment from {attachment_url}: {e}")
             return None
     
+    def download_attachment(self, attachment_url: str, max_retries: int = 3) -> Optional[bytes]:
+        """
+        Download attachment content with retry logic.
+        Handles both regular attachment URLs and inline image URLs.
+        Retries on transient errors (429, 5xx, timeouts).
+        """
+        response = self._get_attachment_response(attachment_url, max_retries=max_retries)
+        if response is None:
+            return None
+        
+        # Check if we got actual content
+        if response.content:
+            return response.content
+        logger.warning(f"Empty content downloaded from {attachment_url}")
+        return None
+    
+    def download_attachment_stream(self, attachment_url: str, max_retries: int = 3) -> Optional[requests.Response]:
+        """
+        Open a streaming GET for an attachment, with the same retry logic as
+        download_attachment. The body is left unread: consume it from
+        ``response.raw`` (content-encoding is decoded) and close the response.
+        Returns None on failure.
+        """
+        response = self._get_attachment_response(attachment_url, max_retries=max_retries, stream=True)
+        if response is not None:
+            response.raw.decode_content = True
+        return response
+    
     def mark_ticket_as_read(self, ticket_id: int) -> bool:
         """
         Mark ticket as read by updating it
@@ -852,20 +1010,12 @@ class ZendeskClient:
         url = f"{self.base_url}/tickets/{ticket_id}.json"
         
         try:
-            # Get current ticket
-            response = self.session.get(url)
-            response.raise_for_status()
-            ticket = response.json().get("ticket", {})
-            
             # Update ticket with a tag to mark as processed
-            # This is a workaround since Zendesk doesn't have read/unread status
-            current_tags = ticket.get("tags", [])
-            if "processed_by_offloader" not in current_tags:
-                current_tags.append("processed_by_offloader")
-            
+            # This is a workaround since Zendesk doesn't have read/unread status.
+            # additional_tags appends server-side: no read-modify-write of tags.
             update_data = {
                 "ticket": {
-                    "tags": current_tags
+                    "additional_tags": [PROCESSED_TAG]
                 }
             }
             
@@ -876,6 +1026,75 @@ class ZendeskClient:
             print(f"Error marking ticket {ticket_id} as read: {e}")
             return False
     
+    def mark_tickets_as_read(self, ticket_ids: List[int]) -> bool:
+        """
+        Bulk variant of mark_ticket_as_read: tags up to 100 tickets per
+        update_many call. Zendesk applies each call as a background job, so
+        the job statuses are polled afterwards and per-ticket failures (e.g.
+        closed tickets) are logged.
+        Returns False if any batch or ticket failed.
+        """
+        if not self.base_url:
+            return False
+        
+        ok = True
+        jobs = []
+        url = f"{self.base_url}/tickets/update_many.json"
+        update_data = {"ticket": {"additional_tags": [PROCESSED_TAG]}}
+        for i in range(0, len(ticket_ids), UPDATE_MANY_MAX_IDS):
+            batch = ticket_ids[i:i + UPDATE_MANY_MAX_IDS]
+            try:
+                response = self.session.put(
+                    url, params={"ids": ",".join(map(str, batch))}, json=update_data
+                )
+                response.raise_for_status()
+                jobs.append(_json(response).get("job_status", {}))
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Error marking {len(batch)} ticket(s) as read: {e}")
+                ok = False
+        
+        # All batches are queued before polling so their jobs run concurrently
+        for job in jobs:
+            if not self._wait_for_job(job):
+                ok = False
+        return ok
+    
+    def _wait_for_job(self, job: Dict) -> bool:
+        """
+        Poll a job_status (from update_many) until it finishes, logging every
+        ticket the job failed to update. Returns False on any failure; a job
+        still running after JOB_STATUS_POLLS polls is logged and counted as ok.
+        """
+        job_url = job.get("url")
+        for _ in range(JOB_STATUS_POLLS):
+            if not job_url or job.get("status") in _JOB_DONE:
+                break
+            time.sleep(JOB_STATUS_POLL_INTERVAL)
+            try:
+                response = self.session.get(job_url, timeout=30)
+                response.raise_for_status()
+                job = _json(response).get("job_status", {})
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Could not check update job {job_url}: {e}")
+                return False
+        
+        status = job.get("status")
+        if status not in _JOB_DONE:
+            logger.info(f"Update job {job.get('id')} still {status} — not waiting for it ({job_url})")
+            return True
+        
+        ok = status == "completed"
+        if not ok:
+            logger.warning(f"Update job {job.get('id')} {status}: {job.get('message')} ({job_url})")
+        for result in job.get("results") or []:
+            if result.get("success") is False or result.get("status") == "Failed" or result.get("error"):
+                logger.warning(
+                    f"Ticket {result.get('id')} not marked as read: "
+                    f"{result.get('error') or result.get('details') or result.get('status')}"
+                )
+                ok = False
+        return ok
+    
     def get_recently_updated_tickets(self, since_minutes: int = 10) -> List[Dict]:
         """
         Fetch only tickets updated in the last `since_minutes` minutes using the
@@ -898,46 +1117,75 @@ class ZendeskClient:
 
         logger.info(f"Fetching tickets updated since {since_dt.strftime('%Y-%m-%d %H:%M:%S')} UTC (last {since_minutes} min)")
 
-        while url:
-            try:
-                response = self.session.get(url, params=params)
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 30))
-                    logger.warning(f"Rate limited — waiting {retry_after}s")
-                    time.sleep(retry_after)
-                    continue
-                if response.status_code == 422:
-                    # start_time too recent (Zendesk requires at least 1 min ago) — return empty
-                    logger.info("Incremental API: start_time too recent, no tickets yet")
-                    return []
-                response.raise_for_status()
-                data = response.json()
-
+        try:
+            for data in self._iter_incremental_pages(url, params):
                 page_tickets = data.get("tickets", [])
                 # Filter out deleted/spam tickets
                 active = [t for t in page_tickets if t.get("status") not in ("deleted",)]
                 tickets.extend(active)
-
-                # Incremental API uses end_of_stream flag
-                if data.get("end_of_stream", True):
-                    break
-                next_url = data.get("next_page")
-                if not next_url:
-                    break
-                url = next_url
-                params = None
-
-            except Exception as e:
-                logger.error(f"Error fetching recent tickets: {e}")
-                break
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 422:
+                # start_time too recent (Zendesk requires at least 1 min ago) — return empty
+                logger.info("Incremental API: start_time too recent, no tickets yet")
+                return []
+            logger.error(f"Error fetching recent tickets: {e}")
+        except Exception as e:
+            logger.error(f"Error fetching recent tickets: {e}")
 
         logger.info(f"Incremental fetch returned {len(tickets)} active tickets updated in last {since_minutes} min")
         return tickets
 
-    def get_new_tickets(self, processed_ticket_ids: set) -> List[Dict]:
+    def get_incremental_tickets(
+        self, start_time: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch every ticket changed since *cursor* (or since the unix
+        *start_time*) with the cursor-based incremental export
+        (/incremental/tickets/cursor.json, up to 1000 tickets per page).
+        Deleted tickets are included (status 'deleted').
+        Returns (tickets, after_cursor); pass after_cursor to the next call
+        to continue exactly where this one stopped. Raises on API errors.
+        """
+        url = f"{self.base_url}/incremental/tickets/cursor.json"
+        params = {"cursor": cursor} if cursor else {"start_time": start_time or 0}
+        tickets: List[Dict] = []
+        after_cursor = cursor
+        for data in self._iter_incremental_pages(url, params):
+            tickets.extend(data.get("tickets", []))
+            after_cursor = data.get("after_cursor") or after_cursor
+        return tickets, after_cursor
+    
+    def _iter_incremental_pages(self, url: str, params: Optional[Dict]) -> Iterator[Dict]:
+        """
+        Yield each page of an incremental export starting at *url*, following
+        after_url (cursor export) or next_page (time-based export) until
+        end_of_stream. Raises on API errors.
+        A 429 that outlasts the session's _RateLimitAdapter retries is re-sent
+        at most RATE_LIMIT_RETRIES more times per page; the adapter holds each
+        re-send until the Retry-After window has passed.
+        """
+        rate_limited = 0
+        while url:
+            response = self.session.get(url, params=params, timeout=60)
+            if response.status_code == 429 and rate_limited < RATE_LIMIT_RETRIES:
+                rate_limited += 1
+                logger.warning(f"Incremental export rate limited — retrying ({rate_limited}/{RATE_LIMIT_RETRIES})")
+                continue
+            response.raise_for_status()
+            data = _json(response)
+            yield data
+            if data.get("end_of_stream", True):
+                return
+            url = data.get("after_url") or data.get("next_page")
+            params = None
+            rate_limited = 0
+
+    def get_new_tickets(self, processed_ticket_ids: set, since: Optional[int] = None) -> List[Dict]:
         """
         Get only new tickets that haven't been processed
-        Fetches ALL tickets to find new ones (uses cursor pagination, no 10K limit)
+        With *since* (unix time) only tickets changed after it are fetched via
+        the incremental export; otherwise, or if that fails, ALL tickets are
+        scanned (cursor pagination, no 10K limit). Raises if the scan fails.
         """
         print(f"Getting new tickets. Already processed: {len(processed_ticket_ids)} tickets")
         
@@ -948,53 +1196,33 @@ class ZendeskClient:
         max_processed_id = max(processed_ticket_ids) if processed_ticket_ids else 0
         print(f"Max processed ticket ID: {max_processed_id}")
         
-        # Fetch ALL tickets using cursor pagination
-        # This is necessary because new tickets could be anywhere in the list
-        all_tickets = []
-        url = f"{self.base_url}/tickets.json"
-        params = {"page[size]": 100}
-        
-        page_count = 0
-        
-        print(f"Fetching all tickets to find new ones...")
+        new_tickets = None
+        if since:
+            try:
+                changed, _ = self.get_incremental_tickets(start_time=since)
+                new_tickets = [
+                    t for t in changed
+                    if t.get("id") not in processed_ticket_ids and t.get("status") != "deleted"
+                ]
+                print(f"Incremental export: {len(changed)} ticket(s) changed since {since}")
+            except Exception as e:
+                logger.warning(f"Incremental export failed, scanning all tickets: {e}")
         
-        while url:
+        if new_tickets is None:
+            # Fetch ALL tickets using cursor pagination
+            # This is necessary because new tickets could be anywhere in the list;
+            # keep only unprocessed ones as pages stream in.
+            print(f"Fetching all tickets to find new ones...")
             try:
-                response = self.session.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                page_tickets = data.get("tickets", [])
-                all_tickets.extend(page_tickets)
-                page_count += 1
-                
-                # Show progress every 20 pages
-                if page_count % 20 == 0:
-                    print(f"Fetched {page_count} pages, {len(all_tickets)} tickets so far...")
-                
-                # Check for next page
-                links = data.get("links", {})
-                next_page = links.get("next")
-                
-                if next_page:
-                    url = next_page
-                    params = None
-                    time.sleep(0.1)
-                else:
-                    break
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching tickets: {e}")
+                new_tickets = [
+                    t for t in self.iter_all_tickets()
+                    if t.get("id") not in processed_ticket_ids
+                ]
+            except Exception as e:
+                # A partial scan would let the caller advance its watermark
+                # past tickets that were never seen
                 logger.error(f"Error fetching tickets: {e}")
-                break
-        
-        print(f"Fetched total of {len(all_tickets)} tickets in {page_count} pages")
-        
-        # Filter to only new tickets
-        new_tickets = [
-            ticket for ticket in all_tickets 
-            if ticket.get("id") not in processed_ticket_ids
-        ]
+                raise
         
         # Sort by ID descending (newest first)
         new_tickets.sort(key=lambda x: x.get("id", 0), reverse=True)